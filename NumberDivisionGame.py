@@ -1,198 +1,24 @@
 import tkinter as tk
-from tkinter import messagebox, ttk
-import random
+from tkinter import filedialog, messagebox, ttk
 import time
-import math
-
-visited_nodes_count = 0
-class GameNode:
-    def __init__(self, number, player1_score, player2_score, game_bank, depth, is_maximizing):
-        self.number = number
-        self.player1_score = player1_score
-        self.player2_score = player2_score
-        self.game_bank = game_bank
-        self.depth = depth
-        self.is_maximizing = is_maximizing
-        self.children = []
-        self.best_move = None
-
-    def generate_children(self, current_player_turn, human_is_player1):
-        self.children = []
-        ai_is_player1 = not human_is_player1
-        ai_turn = (current_player_turn == 0 and ai_is_player1) or \
-                  (current_player_turn == 1 and not ai_is_player1)
-
-        for move in [2, 3]:
-            if self.number % move == 0:
-                new_number = self.number // move
-                new_p1_score = self.player1_score
-                new_p2_score = self.player2_score
-                new_bank = self.game_bank
-
-                if move == 2:
-                    if current_player_turn == 0:
-                        new_p2_score += 2
-                    else:
-                        new_p1_score += 2
-                elif move == 3:
-                    if current_player_turn == 0:
-                        new_p1_score += 3
-                    else:
-                        new_p2_score += 3
-
-                if new_number % 10 == 0 or new_number % 5 == 0:
-                    new_bank += 1
-
-                child_node = GameNode(
-                    new_number,
-                    new_p1_score,
-                    new_p2_score,
-                    new_bank,
-                    self.depth + 1,
-                    not self.is_maximizing
-                )
-                self.children.append((move, child_node))
-
-
-def heuristic_evaluation(node, human_is_player1):
-    ai_score = node.player2_score if human_is_player1 else node.player1_score
-    human_score = node.player1_score if human_is_player1 else node.player2_score
-
-    if node.number <= 10:
-        final_ai_score = ai_score
-        final_human_score = human_score
-
-        if not node.is_maximizing:
-            final_ai_score += node.game_bank
-        else:
-            final_human_score += node.game_bank
 
-        score_diff = final_ai_score - final_human_score
-        if score_diff > 0:
-            return 1000 + score_diff
-        elif score_diff < 0:
-            return -1000 + score_diff
-        else:
-            return 0
-
-    score = ai_score - human_score
-    score += node.game_bank
-
-    if score > 0:
-        score += (30000 - node.number) / 1000
-    elif score < 0:
-        score -= (30000 - node.number) / 1000
-
-    can_ai_add_3 = False
-    can_human_add_3 = False
-    for move in [2, 3]:
-        if node.number % move == 0:
-            if node.is_maximizing:
-                if move == 3:
-                    can_ai_add_3 = True
-            else:
-                if move == 3:
-                    can_human_add_3 = True
-
-    if can_ai_add_3:
-        score += 3
-    if can_human_add_3:
-        score -= 3
-
-    return score
-
-
-def minimax(node, depth, alpha, beta, use_alpha_beta, human_is_player1, max_depth=5):
-    global visited_nodes_count
-    visited_nodes_count += 1
-    current_player_turn = (node.depth % 2 == 0) if human_is_player1 else (
-        node.depth % 2 != 0)
-
-    if node.number <= 10 or depth >= max_depth:
-        return heuristic_evaluation(node, human_is_player1)
-
-    ai_turn = node.is_maximizing
-    actual_turn = -1
-    if human_is_player1:
-        actual_turn = 1 if ai_turn else 0
-    else:
-        actual_turn = 0 if ai_turn else 1
-
-    node.generate_children(actual_turn, human_is_player1)
-
-    if not node.children:
-        return -math.inf if node.is_maximizing else math.inf
-
-    if node.is_maximizing:
-        best_score = -math.inf
-        best_move_for_node = node.children[0][0] if node.children else None
-        for move, child in node.children:
-            score = minimax(child, depth + 1, alpha, beta,
-                            use_alpha_beta, human_is_player1, max_depth)
-            if score > best_score:
-                best_score = score
-                best_move_for_node = move
-            if use_alpha_beta:
-                alpha = max(alpha, best_score)
-                if beta <= alpha:
-                    break
-        if depth == 0:
-            node.best_move = best_move_for_node
-        return best_score
-    else:
-        best_score = math.inf
-        best_move_for_node = node.children[0][0] if node.children else None
-        for move, child in node.children:
-            score = minimax(child, depth + 1, alpha, beta,
-                            use_alpha_beta, human_is_player1, max_depth)
-            if score < best_score:
-                best_score = score
-                best_move_for_node = move  
-            if use_alpha_beta:
-                beta = min(beta, best_score)
-                if beta <= alpha:
-                    break
-        return best_score
-
-
-def get_computer_move(current_number, p1_score, p2_score, bank, algorithm, human_is_player1, max_depth=4):
-    global visited_nodes_count
-    visited_nodes_count = 0
-
-    start_time = time.time()
-    root = GameNode(current_number, p1_score, p2_score, bank, 0, True)
-
-    use_alpha_beta = (algorithm == 'alpha-beta')
-    alpha = -math.inf
-    beta = math.inf
-
-    best_score = minimax(root, 0, alpha, beta,
-                         use_alpha_beta, human_is_player1, max_depth)
-    end_time = time.time()
-    move_time = end_time - start_time
-
-    nodes_visited_this_move = visited_nodes_count
-
-
-    if root.best_move is None and root.children:
-        root.best_move = root.children[0][0]
-    elif not root.children and current_number > 10:
-        if current_number % 2 == 0:
-            root.best_move = 2
-        elif current_number % 3 == 0:
-            root.best_move = 3
-        else:
-            return None, move_time, nodes_visited_this_move
-    elif not root.children:
-        return None, move_time, nodes_visited_this_move
+from numberdivision import (GameRecordWriter, Ponderer, SearchStats, SearchWorker,
+                            TranspositionTable, apply_move, default_book_exists, disable_profiling,
+                            draw_start_numbers, enable_profiling, game_record, get_engine,
+                            legal_moves, open_default_book, open_default_tablebase,
+                            registered_engines, settle_bank)
+from SearchTreeInspector import SearchTreeInspector
+
+DIFFICULTY_CHOICES = {"Any difficulty": None, "Easy": 'easy', "Medium": 'medium', "Hard": 'hard'}
+OUTCOME_CHOICES = {"Any result": None, "First player wins": 'first',
+                   "Second player wins": 'second', "Draw": 'draw'}
 
-    return root.best_move, move_time, nodes_visited_this_move
 
 class NumberGameGUI:
     def __init__(self, master):
         self.master = master
         master.title("Number Division Game")
-        master.geometry("700x550")
+        master.geometry("700x580")
 
         self.current_number = 0
         self.player1_score = 0
@@ -202,8 +28,25 @@ class NumberGameGUI:
         self.current_turn = 0
         self.game_active = False
         self.selected_algorithm = "minimax"
-        self.ai_move_time_total = 0
-        self.ai_moves_count = 0
+        self.search_stats = SearchStats()
+        self.move_stats = None
+        self.transposition_table = TranspositionTable()
+        self.tablebase = open_default_tablebase()
+        self.book = None
+        self.search_worker = SearchWorker()
+        self.ponderer = Ponderer()
+        self.pondered_moves = 0
+        self.search_poll_ms = 20
+        self.start_number = 0
+        self.moves_played = []
+        self.move_times = []
+        self.move_nodes = []
+        self.turn_started = 0.0
+        self.last_search = (0.0, 0)
+        self.record_writer = None
+        self.profiler = None
+        self.inspector = None
+        master.protocol("WM_DELETE_WINDOW", self.on_close)
 
         self.config_frame = tk.LabelFrame(
             master, text="Game Setup", padx=10, pady=10)
@@ -217,19 +60,53 @@ class NumberGameGUI:
         self.numbers_combobox = ttk.Combobox(
             num_sel_frame, textvariable=self.numbers_var, state='readonly', width=10)
         self.numbers_combobox.pack(side=tk.LEFT, padx=5)
+        self.difficulty_var = tk.StringVar(value="Any difficulty")
+        self.difficulty_combobox = ttk.Combobox(
+            num_sel_frame, textvariable=self.difficulty_var, state='readonly', width=14,
+            values=list(DIFFICULTY_CHOICES))
+        self.difficulty_combobox.pack(side=tk.LEFT, padx=5)
+        self.difficulty_combobox.bind('<<ComboboxSelected>>',
+                                      lambda event: self.update_numbers_dropdown())
+        self.outcome_var = tk.StringVar(value="Any result")
+        self.outcome_combobox = ttk.Combobox(
+            num_sel_frame, textvariable=self.outcome_var, state='readonly', width=18,
+            values=list(OUTCOME_CHOICES))
+        self.outcome_combobox.pack(side=tk.LEFT, padx=5)
+        self.outcome_combobox.bind('<<ComboboxSelected>>',
+                                   lambda event: self.update_numbers_dropdown())
         self.update_numbers_dropdown()
 
         algo_frame = tk.Frame(self.config_frame)
         algo_frame.pack(fill='x')
         tk.Label(algo_frame, text="Choose Algorithm:",
                  width=20, anchor='w').pack(side=tk.LEFT)
-        self.algorithm_var = tk.StringVar(value="minimax")
-        self.algorithm_radio_minimax = tk.Radiobutton(
-            algo_frame, text="Minimax", variable=self.algorithm_var, value="minimax", command=self.update_algorithm)
-        self.algorithm_radio_alpha_beta = tk.Radiobutton(
-            algo_frame, text="Alpha-Beta", variable=self.algorithm_var, value="alpha-beta", command=self.update_algorithm)
-        self.algorithm_radio_minimax.pack(side=tk.LEFT, padx=5)
-        self.algorithm_radio_alpha_beta.pack(side=tk.LEFT, padx=5)
+        # A drop-down, since a row of radio buttons outgrows the window as
+        # engines are registered.
+        self.engine_names = {engine.label: engine.name for engine in registered_engines()}
+        self.algorithm_var = tk.StringVar(value=get_engine("minimax").label)
+        self.algorithm_combobox = ttk.Combobox(
+            algo_frame, textvariable=self.algorithm_var, state='readonly', width=14,
+            values=list(self.engine_names))
+        self.algorithm_combobox.pack(side=tk.LEFT, padx=5)
+        self.algorithm_combobox.bind('<<ComboboxSelected>>',
+                                     lambda event: self.update_algorithm())
+
+        options_frame = tk.Frame(self.config_frame)
+        options_frame.pack(fill='x')
+        tk.Label(options_frame, text="Move Sources:",
+                 width=20, anchor='w').pack(side=tk.LEFT)
+        self.use_tablebase_var = tk.BooleanVar(value=self.tablebase is not None)
+        self.use_tablebase_check = tk.Checkbutton(
+            options_frame, text="Perfect play (tablebase)", variable=self.use_tablebase_var)
+        self.use_tablebase_check.pack(side=tk.LEFT, padx=5)
+        if self.tablebase is None:
+            self.use_tablebase_check.config(state=tk.DISABLED)
+        self.use_book_var = tk.BooleanVar(value=default_book_exists())
+        self.use_book_check = tk.Checkbutton(
+            options_frame, text="Opening book", variable=self.use_book_var)
+        self.use_book_check.pack(side=tk.LEFT, padx=5)
+        if not default_book_exists():
+            self.use_book_check.config(state=tk.DISABLED)
 
         player_frame = tk.Frame(self.config_frame)
         player_frame.pack(fill='x')
@@ -243,6 +120,30 @@ class NumberGameGUI:
         self.first_player_human.pack(side=tk.LEFT, padx=5)
         self.first_player_computer.pack(side=tk.LEFT, padx=5)
 
+        depth_frame = tk.Frame(self.config_frame)
+        depth_frame.pack(fill='x')
+        tk.Label(depth_frame, text="Search Depth:",
+                 width=20, anchor='w').pack(side=tk.LEFT)
+        self.depth_var = tk.IntVar(value=4)
+        self.depth_spinbox = tk.Spinbox(
+            depth_frame, from_=1, to=40, textvariable=self.depth_var, width=5, state='readonly')
+        self.depth_spinbox.pack(side=tk.LEFT, padx=5)
+        self.ponder_var = tk.BooleanVar(value=True)
+        self.ponder_check = tk.Checkbutton(
+            depth_frame, text="Think on your turn", variable=self.ponder_var)
+        self.ponder_check.pack(side=tk.LEFT, padx=5)
+        self.profile_var = tk.BooleanVar(value=False)
+        self.profile_check = tk.Checkbutton(
+            depth_frame, text="Profile moves", variable=self.profile_var,
+            command=self.toggle_profiling)
+        self.profile_check.pack(side=tk.LEFT, padx=5)
+        self.export_profile_button = tk.Button(
+            depth_frame, text="Export Profile", command=self.export_profile)
+        self.export_profile_button.pack(side=tk.LEFT, padx=5)
+        self.inspector_button = tk.Button(
+            depth_frame, text="Search Tree", command=self.open_inspector)
+        self.inspector_button.pack(side=tk.LEFT, padx=5)
+
         self.start_button = tk.Button(
             self.config_frame, text="Start Game", command=self.start_game, width=15)
         self.start_button.pack(pady=10)
@@ -278,51 +179,34 @@ class NumberGameGUI:
     def update_numbers_dropdown(self):
         numbers = self._generate_numbers()
         self.numbers_combobox['values'] = [str(num) for num in numbers]
-        if numbers:
-            self.numbers_combobox.set(str(numbers[0]))
+        self.numbers_combobox.set(str(numbers[0]) if numbers else '')
 
     def _generate_numbers(self):
-        count = 0
-        generated = []
-        attempts = 0
-        max_attempts = 20000
-        while count < 5 and attempts < max_attempts:
-            num = random.randint(20000, 30000)
-            if num % 6 == 0 and num not in generated:
-                generated.append(num)
-                count += 1
-            attempts += 1
-
-        while count < 5:
-            fallback_num = 20004 + count * 6
-            if fallback_num <= 30000 and fallback_num not in generated:
-                generated.append(fallback_num)
-            else:
-                fb_attempts = 0
-                while fb_attempts < 100:
-                    num = random.randint(20000, 30000)
-                    if num % 6 == 0 and num not in generated:
-                        generated.append(num)
-                        break
-                    fb_attempts += 1
-                if len(generated) < count + 1:
-                    break
-            count += 1
-
-        return generated
+        try:
+            return draw_start_numbers(5, DIFFICULTY_CHOICES[self.difficulty_var.get()],
+                                      OUTCOME_CHOICES[self.outcome_var.get()])
+        except ValueError:
+            return []
 
     def update_algorithm(self):
-        self.selected_algorithm = self.algorithm_var.get()
+        self.selected_algorithm = self.engine_names[self.algorithm_var.get()]
 
     def toggle_config_widgets(self, state):
         widget_state = tk.DISABLED if state == 'disable' else tk.NORMAL
         combobox_state = tk.DISABLED if state == 'disable' else 'readonly'
 
         self.numbers_combobox.config(state=combobox_state)
-        self.algorithm_radio_minimax.config(state=widget_state)
-        self.algorithm_radio_alpha_beta.config(state=widget_state)
+        self.difficulty_combobox.config(state=combobox_state)
+        self.outcome_combobox.config(state=combobox_state)
+        self.algorithm_combobox.config(state=combobox_state)
+        if self.tablebase is not None:
+            self.use_tablebase_check.config(state=widget_state)
+        if default_book_exists():
+            self.use_book_check.config(state=widget_state)
         self.first_player_human.config(state=widget_state)
         self.first_player_computer.config(state=widget_state)
+        self.depth_spinbox.config(state=tk.DISABLED if state == 'disable' else 'readonly')
+        self.ponder_check.config(state=widget_state)
         self.start_button.config(state=widget_state)
 
     def start_game(self):
@@ -341,10 +225,17 @@ class NumberGameGUI:
         self.game_bank = 0
         self.human_is_player1 = (self.first_player_var.get() == "human")
         self.current_turn = 0
-        self.selected_algorithm = self.algorithm_var.get()
+        self.selected_algorithm = self.engine_names[self.algorithm_var.get()]
         self.game_active = True
-        self.ai_move_time_total = 0
-        self.ai_moves_count = 0
+        self.search_stats = SearchStats()
+        self.move_stats = None
+        self.transposition_table = TranspositionTable()
+        self.ponderer.clear()
+        self.pondered_moves = 0
+        self.start_number = self.current_number
+        self.moves_played = []
+        self.move_times = []
+        self.move_nodes = []
 
         self.toggle_config_widgets('disable')
         self.update_score_labels()
@@ -392,20 +283,18 @@ class NumberGameGUI:
 
     def update_move_buttons(self):
         self.clear_move_buttons()
-        possible_moves = []
+        possible_moves = legal_moves(self.current_number)
         button_frame = tk.Frame(self.moves_frame)
         button_frame.pack()
         self.move_buttons.append(button_frame)
 
-        if self.current_number > 10 and self.current_number % 2 == 0:
-            possible_moves.append(2)
+        if 2 in possible_moves:
             button2 = tk.Button(button_frame, text="Divide by 2",
                                 command=lambda div=2: self.handle_human_move(div), width=15)
             button2.pack(side=tk.LEFT, padx=5, pady=5)
             self.move_buttons.append(button2)
 
-        if self.current_number > 10 and self.current_number % 3 == 0:
-            possible_moves.append(3)
+        if 3 in possible_moves:
             button3 = tk.Button(button_frame, text="Divide by 3",
                                 command=lambda div=3: self.handle_human_move(div), width=15)
             button3.pack(side=tk.LEFT, padx=5, pady=5)
@@ -422,27 +311,101 @@ class NumberGameGUI:
         if not is_human_turn:
             return
 
+        self.ponderer.stop()
         self.clear_move_buttons()
         self.process_move(divisor)
 
+    def start_pondering(self):
+        if not self.ponder_var.get() or not get_engine(self.selected_algorithm).ponder or \
+                (self.tablebase is not None and self.use_tablebase_var.get()):
+            return
+        self.ponderer.start(
+            self.current_number,
+            self.player1_score,
+            self.player2_score,
+            self.game_bank,
+            self.current_turn,
+            self.human_is_player1,
+            self.selected_algorithm,
+            self.transposition_table
+        )
+
     def handle_computer_move(self):
         self.clear_move_buttons()
         self.update_display()
-        self.master.update_idletasks()
 
-        move, move_time, nodes_visited = get_computer_move(
+        if self.ponder_var.get():
+            pondered = self.ponderer.lookup(
+                self.current_number,
+                self.player1_score,
+                self.player2_score,
+                self.game_bank,
+                self.human_is_player1,
+                min_depth=self.depth_var.get()
+            )
+            if pondered is not None:
+                self.pondered_moves += 1
+                self.search_stats.searches += 1
+                self.last_search = (0.0, 0)
+                self.play_computer_move(pondered[1])
+                return
+
+        stop_button = tk.Button(self.moves_frame, text="Stop / Move Now",
+                                command=self.search_worker.stop, width=15)
+        stop_button.pack(pady=5)
+        self.move_buttons.append(stop_button)
+
+        # The tree is only recorded while the inspector is open.
+        if self.inspector_is_open():
+            self.move_stats = self.inspector.stats()
+        else:
+            self.move_stats = SearchStats()
+        self.search_worker.start(
             self.current_number,
             self.player1_score,
             self.player2_score,
             self.game_bank,
             self.selected_algorithm,
-            self.human_is_player1
+            self.human_is_player1,
+            max_depth=self.depth_var.get(),
+            tt=self.transposition_table,
+            tablebase=self.tablebase if self.use_tablebase_var.get() else None,
+            stats=self.move_stats,
+            book=self.get_book()
         )
-        self.total_visited_nodes = self.total_visited_nodes + nodes_visited if hasattr(self,
-                                                                                       'total_visited_nodes') else nodes_visited
-        self.ai_move_time_total += move_time
-        self.ai_moves_count += 1
+        self.master.after(self.search_poll_ms, self.poll_computer_move)
+
+    def get_book(self):
+        if not self.use_book_var.get():
+            return None
+        if self.book is None:
+            self.book = open_default_book()
+            if self.book is None:
+                self.use_book_var.set(False)
+        return self.book
+
+    def poll_computer_move(self):
+        if not self.game_active:
+            return
+
+        result = self.search_worker.poll()
+        if result is None:
+            self.master.after(self.search_poll_ms, self.poll_computer_move)
+            return
 
+        self.clear_move_buttons()
+        if isinstance(result, Exception):
+            self.end_game(f"Internal Error: AI search failed ({result})")
+            return
+
+        move, move_time, nodes_visited = result
+        self.last_search = (move_time, nodes_visited)
+        self.search_stats.merge(self.move_stats)
+        if self.inspector_is_open():
+            self.inspector.show()
+        self.play_computer_move(move)
+
+    def play_computer_move(self, move):
         if move is None:
 
             if self.current_number <= 10:
@@ -466,31 +429,63 @@ class NumberGameGUI:
                 f"Internal Error: Invalid division attempted ({divisor})")
             return
 
-        new_number = self.current_number // divisor
+        if self.is_human_turn():
+            move_time, nodes = time.perf_counter() - self.turn_started, 0
+        else:
+            move_time, nodes = self.last_search
+        self.moves_played.append(divisor)
+        self.move_times.append(move_time)
+        self.move_nodes.append(nodes)
+
+        self.current_number, self.player1_score, self.player2_score, self.game_bank = apply_move(
+            self.current_number, self.player1_score, self.player2_score,
+            self.game_bank, self.current_turn, divisor)
+        self.current_turn = 1 - self.current_turn
 
-        if divisor == 2:
-            if self.current_turn == 0:
-                self.player2_score += 2
-            else:
-                self.player1_score += 2
-        elif divisor == 3:
-            if self.current_turn == 0:
-                self.player1_score += 3
-            else:
-                self.player2_score += 3
+        self.handle_turn()
 
-        if new_number % 10 == 0 or new_number % 5 == 0:
-            self.game_bank += 1
+    def toggle_profiling(self):
+        if self.profile_var.get():
+            self.profiler = enable_profiling()
+        else:
+            disable_profiling()
 
-        self.current_number = new_number
-        self.current_turn = 1 - self.current_turn
+    def export_profile(self):
+        if self.profiler is None or not len(self.profiler):
+            messagebox.showinfo("Profile", "No moves have been profiled yet.")
+            return
+        prefix = filedialog.asksaveasfilename(
+            title="Export profile", initialfile="numberdivision-profile")
+        if not prefix:
+            return
+        try:
+            paths = self.profiler.export(prefix)
+        except OSError as exc:
+            messagebox.showerror("Profile", f"Could not export the profile: {exc}")
+            return
+        messagebox.showinfo("Profile", "Wrote:\n" + "\n".join(paths))
 
-        self.handle_turn()
+    def inspector_is_open(self):
+        return self.inspector is not None and self.inspector.is_open()
+
+    def open_inspector(self):
+        if self.inspector_is_open():
+            self.inspector.window.lift()
+        else:
+            self.inspector = SearchTreeInspector(self.master)
 
     def handle_turn(self):
         if not self.game_active:
             return
+        if self.profile_var.get() and self.profiler is not None:
+            # Redraws run here on the Tk thread; the search itself is
+            # profiled in the worker thread.
+            with self.profiler.capture(f"redraw {self.current_number}"):
+                self._handle_turn()
+        else:
+            self._handle_turn()
 
+    def _handle_turn(self):
         if self.current_number <= 10:
             self.end_game()
             return
@@ -501,7 +496,10 @@ class NumberGameGUI:
                         (self.current_turn == 1 and not self.human_is_player1)
 
         if is_human_turn:
+            self.turn_started = time.perf_counter()
             self.update_move_buttons()
+            if self.game_active:
+                self.start_pondering()
         else:
             self.handle_computer_move()
 
@@ -510,15 +508,14 @@ class NumberGameGUI:
             return
         self.game_active = False
 
+        self.search_worker.stop()
+        self.ponderer.stop()
         self.clear_move_buttons()
 
-        last_player_turn = 1 - self.current_turn
-        if self.game_bank > 0:
-            if last_player_turn == 0:
-                self.player1_score += self.game_bank
-            else:
-                self.player2_score += self.game_bank
-            self.game_bank = 0
+        self.player1_score, self.player2_score = settle_bank(
+            self.player1_score, self.player2_score, self.game_bank, self.current_turn)
+        self.game_bank = 0
+        self.record_game()
 
         self.update_display()
 
@@ -545,12 +542,24 @@ class NumberGameGUI:
 
         result_message += winner
 
-        if self.ai_moves_count > 0:
-            avg_time = self.ai_move_time_total / self.ai_moves_count
+        stats = self.search_stats
+        if stats.searches > 0:
+            avg_time = stats.elapsed / stats.searches
             result_message += f"\n\nAvg AI move time: {avg_time:.8f}s"
+            result_message += f"\nTotal visited nodes during AI searches: {stats.nodes}"
+            result_message += f"\nLeaf evaluations: {stats.leaf_evaluations} ({stats.terminal_hits} game ends)"
+            if stats.cutoffs:
+                result_message += f"\nAlpha-beta cutoffs: {stats.cutoffs} ({stats.cutoff_rate():.1%} of interior nodes)"
+            if stats.iterations:
+                deepest = max(depth for depth, _, _ in stats.iterations)
+                result_message += f"\nDeepest completed iteration: {deepest}"
 
-        if hasattr(self, 'total_visited_nodes'):
-            result_message += f"\nTotal visited nodes during AI searches: {self.total_visited_nodes}"
+        if self.pondered_moves:
+            result_message += f"\nMoves answered from pondering: {self.pondered_moves}"
+
+        tt = self.transposition_table
+        if tt.hits + tt.misses > 0:
+            result_message += f"\nTransposition table hit rate: {tt.hit_rate():.1%} ({tt.hits}/{tt.hits + tt.misses})"
 
         self.master.after(100, lambda: messagebox.showinfo(
             "Game Over", result_message))
@@ -558,6 +567,34 @@ class NumberGameGUI:
         self.turn_label.config(text="Game Over. Ready for setup.")
         self.update_numbers_dropdown()
 
+    def is_human_turn(self):
+        return (self.current_turn == 0 and self.human_is_player1) or \
+               (self.current_turn == 1 and not self.human_is_player1)
+
+    def record_game(self):
+        computer = f"{self.selected_algorithm}:{self.depth_var.get()}"
+        players = ('human', computer) if self.human_is_player1 else (computer, 'human')
+        try:
+            if self.record_writer is None:
+                self.record_writer = GameRecordWriter()
+            self.record_writer.write(game_record(
+                self.start_number, players, self.moves_played, self.move_times, self.move_nodes,
+                (self.player1_score, self.player2_score)))
+        except (OSError, ValueError) as exc:
+            print(f"Could not record the game: {exc}")
+
+    def on_close(self):
+        self.game_active = False
+        self.search_worker.shutdown()
+        self.ponderer.stop()
+        if self.book is not None:
+            self.book.close()
+        if self.record_writer is not None:
+            self.record_writer.close()
+        disable_profiling()
+        self.master.destroy()
+
+
 def main():
     root = tk.Tk()
     game_gui = NumberGameGUI(root)
@@ -565,4 +602,4 @@ def main():
 
 
 if __name__ == "__main__":
-    main()
\ No newline at end of file
+    main()
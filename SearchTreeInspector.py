@@ -0,0 +1,162 @@
+import tkinter as tk
+
+from numberdivision import SearchTree
+from numberdivision.search_tree import HAS_VALUE
+
+ROW_HEIGHT = 18
+INDENT = 18
+
+
+class SearchTreeInspector:
+    # Shows the tree of the last search. Only the rows inside the visible
+    # part of the canvas are drawn, so the cost of a redraw does not depend
+    # on how many nodes the tree holds or how many rows are expanded.
+    def __init__(self, master):
+        self.capture = SearchTree()
+        self.tree = None
+        self.rows = []
+        self.expanded = set()
+
+        self.window = tk.Toplevel(master)
+        self.window.title("Search Tree")
+        self.window.geometry("820x520")
+        self.window.protocol("WM_DELETE_WINDOW", self.close)
+
+        top_frame = tk.Frame(self.window)
+        top_frame.pack(fill='x', padx=5, pady=5)
+        self.summary_label = tk.Label(top_frame, text="Waiting for the next computer move...",
+                                      anchor='w')
+        self.summary_label.pack(side=tk.LEFT, fill='x', expand=True)
+        tk.Button(top_frame, text="Collapse All", command=self.collapse_all).pack(side=tk.RIGHT)
+        tk.Button(top_frame, text="Expand Best Line",
+                  command=self.expand_best_line).pack(side=tk.RIGHT, padx=5)
+
+        canvas_frame = tk.Frame(self.window)
+        canvas_frame.pack(fill='both', expand=True, padx=5, pady=5)
+        self.scrollbar = tk.Scrollbar(canvas_frame, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill='y')
+        self.canvas = tk.Canvas(canvas_frame, background='white', yscrollincrement=ROW_HEIGHT,
+                                yscrollcommand=self.scrollbar.set)
+        self.canvas.pack(side=tk.LEFT, fill='both', expand=True)
+        self.canvas.bind('<Configure>', lambda event: self.redraw())
+        self.canvas.bind('<Button-1>', self.on_click)
+        self.canvas.bind('<MouseWheel>', lambda event: self.scroll(-1 if event.delta > 0 else 1))
+        self.canvas.bind('<Button-4>', lambda event: self.scroll(-1))
+        self.canvas.bind('<Button-5>', lambda event: self.scroll(1))
+        self.is_closed = False
+
+    def is_open(self):
+        return not self.is_closed
+
+    def close(self):
+        self.is_closed = True
+        self.tree = None
+        self.capture = None
+        self.window.destroy()
+
+    def stats(self):
+        return self.capture.stats()
+
+    def show(self):
+        tree = self.capture.tree()
+        self.tree = tree
+        self.expanded = set()
+        self.rows = [0] if len(tree) else []
+        if not len(tree):
+            self.summary_label.config(
+                text="The last move recorded no tree (only the minimax, alpha-beta, negamax, "
+                     "PVS and MTD(f) searches do; book, tablebase and pondered moves skip them).")
+        else:
+            status = "complete" if tree.complete else "partial (search stopped)"
+            if tree.truncated:
+                status += f", stopped recording at {len(tree)} nodes"
+            self.summary_label.config(text=f"{len(tree)} nodes, {status}. "
+                                           f"Click a node to expand or collapse it.")
+            self.expand(0)
+        self.canvas.yview_moveto(0)
+        self.redraw()
+
+    def expand(self, row):
+        index = self.rows[row]
+        if index in self.expanded or not self.tree.has_children(index):
+            return
+        self.expanded.add(index)
+        self.rows[row + 1:row + 1] = list(self.tree.children(index))
+
+    def collapse(self, row):
+        index = self.rows[row]
+        if index not in self.expanded:
+            return
+        depth = self.tree.depth[index]
+        end = row + 1
+        while end < len(self.rows) and self.tree.depth[self.rows[end]] > depth:
+            self.expanded.discard(self.rows[end])
+            end += 1
+        self.expanded.discard(index)
+        del self.rows[row + 1:end]
+
+    def collapse_all(self):
+        if self.rows:
+            self.collapse(0)
+            self.redraw()
+
+    def expand_best_line(self):
+        if not self.rows:
+            return
+        self.collapse(0)
+        row = 0
+        while True:
+            self.expand(row)
+            best = self.tree.best_child(self.rows[row])
+            if best is None:
+                break
+            row = self.rows.index(best, row + 1)
+        self.redraw()
+        self.canvas.yview_moveto(max(0, (row - 5) / max(1, len(self.rows))))
+        self.redraw()
+
+    def on_click(self, event):
+        if self.tree is None:
+            return
+        row = int(self.canvas.canvasy(event.y) // ROW_HEIGHT)
+        if not 0 <= row < len(self.rows):
+            return
+        if self.rows[row] in self.expanded:
+            self.collapse(row)
+        else:
+            self.expand(row)
+        self.redraw()
+
+    def yview(self, *args):
+        self.canvas.yview(*args)
+        self.redraw()
+
+    def scroll(self, rows):
+        self.canvas.yview_scroll(rows, 'units')
+        self.redraw()
+
+    def redraw(self):
+        if self.is_closed:
+            return
+        self.canvas.delete('row')
+        self.canvas.config(scrollregion=(0, 0, 2000, max(1, len(self.rows)) * ROW_HEIGHT))
+        if not self.rows:
+            return
+        first = max(0, int(self.canvas.canvasy(0) // ROW_HEIGHT))
+        last = min(len(self.rows), first + self.canvas.winfo_height() // ROW_HEIGHT + 2)
+        tree = self.tree
+        for row in range(first, last):
+            index = self.rows[row]
+            if not tree.has_children(index):
+                marker = '  '
+            else:
+                marker = '- ' if index in self.expanded else '+ '
+            if tree.pruned_moves(index):
+                color = 'firebrick'
+            elif not tree.flags[index] & HAS_VALUE:
+                color = 'gray50'
+            else:
+                color = 'black'
+            self.canvas.create_text(4 + tree.depth[index] * INDENT, row * ROW_HEIGHT + 2,
+                                    anchor='nw', text=marker + tree.describe(index), fill=color,
+                                    font=('Courier', 10), tags='row')
@@ -0,0 +1,21 @@
+from .book import OpeningBook, build_book, default_book_exists, open_default_book
+from .engines import Engine, engine_names, get_engine, register, registered_engines
+from .evaluation import (DEFAULT_WEIGHTS, Weights, current_weights, heuristic_evaluation,
+                         load_weights, save_weights, use_weights)
+from .fast_search import get_fast_computer_move
+from .lattice_solver import LatticeSolution, factor_number, get_lattice_move, solve_lattice
+from .mcts import run_mcts
+from .negamax import alpha_beta, mtdf
+from .profiling import Profiler, disable_profiling, enable_profiling
+from .records import (GameRecord, GameRecordWriter, analyse_records, game_record,
+                      read_records)
+from .rules import (END_NUMBER, MAX_START_NUMBER, MIN_START_NUMBER, GameState, apply_move,
+                    is_game_over, legal_moves, settle_bank, start_numbers)
+from .search import (GameNode, SearchControl, SearchTimeout, get_computer_move,
+                     minimax)
+from .search_tree import CapturedTree, SearchTree
+from .start_index import StartIndex, StartInfo, draw_start_numbers, start_index
+from .stats import SearchStats
+from .tablebase import Tablebase, build_tablebase, open_default_tablebase
+from .transposition import TT_EXACT, TT_LOWER, TT_UPPER, TranspositionTable, position_key
+from .worker import Ponderer, SearchWorker, ponder_key
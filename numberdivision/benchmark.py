@@ -0,0 +1,164 @@
+import json
+import math
+import platform
+import random
+import time
+
+from .rules import GameState, start_numbers
+from .search import get_computer_move
+from .stats import SearchStats
+
+DEFAULT_ENGINES = ['minimax', 'alpha-beta', 'negamax', 'pvs', 'mtdf']
+DEFAULT_DEPTHS = [2, 4, 6, 8]
+DEFAULT_SEED = 21
+DEFAULT_POSITIONS = 200
+
+
+def benchmark_positions(count=DEFAULT_POSITIONS, seed=DEFAULT_SEED):
+    # Half of the set are real game positions a few plies after a GUI start
+    # number, half are numbers with many factors of 2 and 3 so the deeper
+    # depths still have a tree to search.
+    rng = random.Random(seed)
+    numbers = list(start_numbers())
+    positions = []
+    while len(positions) < count:
+        if len(positions) % 2 == 0:
+            game = GameState(rng.choice(numbers))
+            for _ in range(rng.randint(0, 3)):
+                moves = game.legal_moves()
+                if not moves:
+                    break
+                game.play(rng.choice(moves))
+            if game.is_over():
+                continue
+            positions.append((game.number, game.player1_score, game.player2_score,
+                              game.game_bank, game.current_turn == 1))
+        else:
+            number = 2 ** rng.randint(8, 20) * 3 ** rng.randint(4, 12) * rng.choice([1, 5, 7, 11])
+            positions.append((number, 0, 0, 0, rng.random() < 0.5))
+    return positions
+
+
+def _measure(engine, depth, positions, repeat):
+    stats = SearchStats()
+    move_times = []
+    for number, p1_score, p2_score, bank, human_is_player1 in positions:
+        best_time = math.inf
+        for attempt in range(repeat):
+            search_stats = stats if attempt == 0 else None
+            start_time = time.perf_counter()
+            get_computer_move(number, p1_score, p2_score, bank, engine, human_is_player1, depth,
+                              stats=search_stats)
+            best_time = min(best_time, time.perf_counter() - start_time)
+        move_times.append(best_time)
+    return stats, move_times
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+def run_benchmark(engines=None, depths=None, positions=None, repeat=3, seed=DEFAULT_SEED):
+    engines = engines or DEFAULT_ENGINES
+    depths = depths or DEFAULT_DEPTHS
+    if positions is None:
+        positions = benchmark_positions(seed=seed)
+
+    results = []
+    full_width_nodes = {}
+    alpha_beta_nodes = {}
+    for depth in depths:
+        for engine in engines:
+            stats, move_times = _measure(engine, depth, positions, repeat)
+            nodes = stats.nodes
+            seconds = sum(move_times)
+            sorted_times = sorted(move_times)
+            if engine == 'minimax':
+                full_width_nodes[depth] = nodes
+            elif engine == 'alpha-beta':
+                alpha_beta_nodes[depth] = nodes
+            results.append({
+                'engine': engine,
+                'depth': depth,
+                'positions': len(positions),
+                'nodes': nodes,
+                'seconds': seconds,
+                'nodes_per_sec': nodes / seconds if seconds > 0 else None,
+                'time_per_move': seconds / len(positions),
+                'time_per_move_p50': _percentile(sorted_times, 0.5),
+                'time_per_move_p99': _percentile(sorted_times, 0.99),
+                'effective_branching_factor': (nodes / len(positions)) ** (1 / depth),
+                'leaf_evaluations': stats.leaf_evaluations,
+                'terminal_hits': stats.terminal_hits,
+                'cutoffs': stats.cutoffs,
+                'cutoffs_by_ply': stats.cutoffs_by_ply,
+                'cutoff_rate': stats.cutoff_rate(),
+            })
+
+    for result in results:
+        full_width = full_width_nodes.get(result['depth'])
+        if full_width:
+            result['pruned_fraction'] = 1 - result['nodes'] / full_width
+        alpha_beta = alpha_beta_nodes.get(result['depth'])
+        if alpha_beta:
+            result['nodes_vs_alpha_beta'] = result['nodes'] / alpha_beta
+
+    return {
+        'meta': {
+            'seed': seed,
+            'positions': len(positions),
+            'repeat': repeat,
+            'python': platform.python_version(),
+            'machine': platform.machine(),
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': results,
+    }
+
+
+def compare_to_baseline(current, baseline, time_tolerance=0.15):
+    regressions = []
+    baseline_results = {(r['engine'], r['depth']): r for r in baseline['results']}
+    for result in current['results']:
+        key = (result['engine'], result['depth'])
+        reference = baseline_results.get(key)
+        if reference is None or reference['positions'] != result['positions']:
+            continue
+        label = f"{key[0]} depth {key[1]}"
+        if result['nodes'] > reference['nodes']:
+            regressions.append(
+                f"{label}: nodes {reference['nodes']} -> {result['nodes']}")
+        if result['time_per_move'] > reference['time_per_move'] * (1 + time_tolerance):
+            regressions.append(
+                f"{label}: time per move {reference['time_per_move'] * 1e6:.1f}us -> "
+                f"{result['time_per_move'] * 1e6:.1f}us")
+    return regressions
+
+
+def format_report(report):
+    lines = [f"{'engine':<11} {'depth':>5} {'nodes':>10} {'nodes/sec':>11} {'us/move':>9} "
+             f"{'p99 us':>9} {'EBF':>6} {'cutoffs':>8} {'pruned':>7} {'vs a-b':>7}"]
+    for result in report['results']:
+        nodes_per_sec = result['nodes_per_sec'] or 0
+        pruned = result.get('pruned_fraction')
+        versus_alpha_beta = result.get('nodes_vs_alpha_beta')
+        lines.append(
+            f"{result['engine']:<11} {result['depth']:>5} {result['nodes']:>10} "
+            f"{nodes_per_sec:>11.0f} {result['time_per_move'] * 1e6:>9.1f} "
+            f"{result['time_per_move_p99'] * 1e6:>9.1f} "
+            f"{result['effective_branching_factor']:>6.3f} "
+            f"{result['cutoff_rate']:>8.1%} "
+            f"{'' if pruned is None else f'{pruned:.1%}':>7} "
+            f"{'' if versus_alpha_beta is None else f'{versus_alpha_beta:.1%}':>7}")
+    return '\n'.join(lines)
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_report(report, path):
+    with open(path, 'w') as f:
+        json.dump(report, f, indent=2)
@@ -0,0 +1,144 @@
+import math
+import mmap
+import os
+import struct
+
+from .fast_search import SearchState
+from .negamax import alpha_beta
+from .rules import MOVES, start_numbers
+from .transposition import TranspositionTable
+
+BOOK_MAGIC = b'NDOB'
+BOOK_VERSION = 1
+HEADER_FORMAT = '<4sHHHI'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+# number, score difference and bank of the player to move, then the best
+# move and its value (the heuristic scaled to an integer, as in negamax.py).
+RECORD_FORMAT = '<IhBBi'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+KEY_FORMAT = '<IhB'
+
+DEFAULT_BOOK_PLIES = 6
+DEFAULT_BOOK_DEPTH = 20
+DEFAULT_BOOK_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'opening.book')
+
+
+def book_key(number, p1_score, p2_score, bank, human_is_player1):
+    ai_score = p2_score if human_is_player1 else p1_score
+    human_score = p1_score if human_is_player1 else p2_score
+    return (number, ai_score - human_score, bank)
+
+
+def opening_positions(numbers=None, plies=DEFAULT_BOOK_PLIES):
+    # Every position with a move to make in the first `plies` plies of a game,
+    # seen from the player to move, so one entry serves the computer as
+    # either player.
+    if numbers is None:
+        numbers = start_numbers()
+    positions = set()
+    layer = {(number, 0, 0) for number in numbers}
+    for _ in range(plies):
+        next_layer = set()
+        for number, score_diff, bank in layer:
+            if number <= 10:
+                continue
+            moves = [move for move in MOVES if number % move == 0]
+            if not moves:
+                continue
+            positions.add((number, score_diff, bank))
+            for move in moves:
+                child = number // move
+                gain = 3 if move == 3 else -2
+                next_layer.add((child, -(score_diff + gain), bank + (1 if child % 5 == 0 else 0)))
+        layer = next_layer
+    return sorted(positions)
+
+
+def build_book(path=DEFAULT_BOOK_PATH, numbers=None, plies=DEFAULT_BOOK_PLIES,
+               depth=DEFAULT_BOOK_DEPTH):
+    positions = opening_positions(numbers, plies)
+    tt = TranspositionTable(max_entries=1 << 20)
+
+    buffer = bytearray(HEADER_SIZE + len(positions) * RECORD_SIZE)
+    struct.pack_into(HEADER_FORMAT, buffer, 0, BOOK_MAGIC, BOOK_VERSION, plies, depth,
+                     len(positions))
+    offset = HEADER_SIZE
+    for number, score_diff, bank in positions:
+        state = SearchState(number, score_diff, bank)
+        value, move = alpha_beta(state, depth, -math.inf, math.inf, 0, tt)
+        struct.pack_into(RECORD_FORMAT, buffer, offset, number, score_diff, bank, move, value)
+        offset += RECORD_SIZE
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(buffer)
+    os.replace(tmp_path, path)
+    return path, len(positions)
+
+
+class OpeningBook:
+    def __init__(self, path=DEFAULT_BOOK_PATH):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Opening book file is empty: {path}")
+
+        magic, version, plies, depth, count = struct.unpack_from(HEADER_FORMAT, self._data, 0)
+        if magic != BOOK_MAGIC or version != BOOK_VERSION or \
+                len(self._data) != HEADER_SIZE + count * RECORD_SIZE:
+            self.close()
+            raise ValueError(f"Not a valid opening book file: {path}")
+        self.plies = plies
+        self.depth = depth
+        self.count = count
+
+    def close(self):
+        self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def __len__(self):
+        return self.count
+
+    def lookup(self, number, score_diff, bank):
+        # Records are sorted by key, so a binary search touches only the
+        # handful of pages on its path.
+        key = (number, score_diff, bank)
+        low, high = 0, self.count
+        while low < high:
+            middle = (low + high) // 2
+            record_key = struct.unpack_from(KEY_FORMAT, self._data, HEADER_SIZE + middle * RECORD_SIZE)
+            if record_key < key:
+                low = middle + 1
+            elif record_key > key:
+                high = middle
+            else:
+                record = struct.unpack_from(RECORD_FORMAT, self._data, HEADER_SIZE + middle * RECORD_SIZE)
+                return record[3], record[4]
+        return None
+
+    def best_move(self, number, p1_score, p2_score, bank, human_is_player1):
+        entry = self.lookup(*book_key(number, p1_score, p2_score, bank, human_is_player1))
+        return entry[0] if entry is not None else None
+
+
+def default_book_exists():
+    return os.path.exists(DEFAULT_BOOK_PATH)
+
+
+def open_default_book():
+    if not default_book_exists():
+        return None
+    try:
+        return OpeningBook(DEFAULT_BOOK_PATH)
+    except (OSError, ValueError):
+        return None
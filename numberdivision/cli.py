@@ -0,0 +1,623 @@
+import argparse
+import asyncio
+import itertools
+import os
+import random
+import statistics
+import subprocess
+import sys
+import time
+
+from .book import (DEFAULT_BOOK_DEPTH, DEFAULT_BOOK_PATH, DEFAULT_BOOK_PLIES, OpeningBook,
+                   build_book, open_default_book)
+from .benchmark import (DEFAULT_DEPTHS, DEFAULT_ENGINES, DEFAULT_POSITIONS, DEFAULT_SEED,
+                        benchmark_positions, compare_to_baseline, format_report, load_report,
+                        run_benchmark, save_report)
+from .engines import engine_names, get_engine
+from .evaluation import DEFAULT_WEIGHTS, DEFAULT_WEIGHTS_PATH, save_weights
+from .fast_search import compare_engines
+from .lattice_solver import solve_lattice
+from .parallel import DEFAULT_SPLIT_DEPTH, measure_speedup
+from .profiling import DEFAULT_PROFILE_CAPACITY, disable_profiling, enable_profiling
+from .records import (DEFAULT_RECORDS_PATH, GameRecordWriter, analyse_records, game_record,
+                      read_records)
+from .rules import MAX_START_NUMBER, MIN_START_NUMBER, GameState, start_numbers
+from .search import get_computer_move
+from .server import DEFAULT_CACHE_SIZE, DEFAULT_HOST, DEFAULT_PORT, run_loadgen, serve
+from .start_index import DIFFICULTIES, WINNERS, start_index
+from .tournament import PlayerConfig, parse_config, play_game, run_tournament
+from .tuning import (DEFAULT_TUNING_ALGORITHM, DEFAULT_TUNING_DEPTH, TUNED_FIELDS, compare_weights,
+                     spsa_tune, tuning_numbers)
+from .tablebase import (DEFAULT_BANK_SLOTS, DEFAULT_MAX_NUMBER, DEFAULT_TABLEBASE_PATH, NO_MOVE,
+                        Tablebase, build_tablebase)
+from .transposition import TranspositionTable
+from .worker import SOLVED_DEPTH, Ponderer
+
+ALGORITHMS = engine_names()
+DEFAULT_PLAY_DEPTH = 4
+
+
+def _player_tag(player, human_player):
+    return "Human" if player == human_player else "Computer"
+
+
+def command_play(args):
+    number = args.number if args.number is not None else random.choice(start_numbers())
+    game = GameState(number)
+    human_player = 1 if args.computer_first else 0
+    human_is_player1 = human_player == 0
+    tt = TranspositionTable()
+    ponderer = Ponderer()
+    book = None if args.no_book else open_default_book()
+    # With a time budget and no --depth the search is limited by time alone.
+    depth = args.depth
+    if depth is None and args.time_budget_ms is None:
+        depth = DEFAULT_PLAY_DEPTH
+    ponder = not args.no_ponder and get_engine(args.algorithm).ponder
+    move_times = []
+    move_nodes = []
+    thinking_since = None
+
+    print(f"Starting number: {number}")
+    while not game.is_over():
+        player = game.current_turn
+        print(f"\nNumber: {game.number}  P1: {game.player1_score}  "
+              f"P2: {game.player2_score}  Bank: {game.game_bank}")
+        if player == human_player:
+            moves = game.legal_moves()
+            if thinking_since is None:
+                thinking_since = time.perf_counter()
+            if ponder:
+                ponderer.start(game.number, game.player1_score, game.player2_score, game.game_bank,
+                               game.current_turn, human_is_player1, args.algorithm, tt)
+            try:
+                choice = input(f"Your move, divide by ({'/'.join(str(m) for m in moves)}): ").strip()
+            finally:
+                ponderer.stop()
+            if not choice.isdigit() or int(choice) not in moves:
+                print("Invalid move.")
+                continue
+            game.play(int(choice))
+            move_times.append(time.perf_counter() - thinking_since)
+            move_nodes.append(0)
+            thinking_since = None
+        else:
+            pondered = ponderer.lookup(game.number, game.player1_score, game.player2_score,
+                                       game.game_bank, human_is_player1,
+                                       min_depth=SOLVED_DEPTH if depth is None else depth)
+            if pondered is not None:
+                move = pondered[1]
+                move_time, nodes = 0.0, 0
+                reached = "the end of the game" if pondered[0] == SOLVED_DEPTH else f"depth {pondered[0]}"
+                print(f"Computer divides by {move} (pondered to {reached})")
+            else:
+                move, move_time, nodes = get_computer_move(
+                    game.number, game.player1_score, game.player2_score, game.game_bank,
+                    args.algorithm, human_is_player1, depth, tt,
+                    time_budget_ms=args.time_budget_ms, book=book)
+                if move is None:
+                    move = game.legal_moves()[0]
+                print(f"Computer divides by {move} ({move_time:.6f}s, {nodes} nodes)")
+            game.play(move)
+            move_times.append(move_time)
+            move_nodes.append(nodes)
+
+    p1_final, p2_final = game.final_scores()
+    print(f"\nGame over at {game.number}.")
+    print(f"P1 ({_player_tag(0, human_player)}): {p1_final}")
+    print(f"P2 ({_player_tag(1, human_player)}): {p2_final}")
+    winner = game.winner()
+    print("It's a draw!" if winner is None else f"Player {winner + 1} wins!")
+    if book is not None:
+        book.close()
+    if not args.no_record:
+        limit = f"{args.time_budget_ms:g}ms" if depth is None else depth
+        players = [f"{args.algorithm}:{limit}"] * 2
+        players[human_player] = 'human'
+        try:
+            with GameRecordWriter(args.records) as records:
+                records.write(game_record(number, players, game.moves, move_times, move_nodes,
+                                          (p1_final, p2_final)))
+        except (OSError, ValueError) as exc:
+            print(f"Could not record the game: {exc}")
+
+
+def command_analyse(args):
+    human_is_player1 = args.turn == 1
+    print(f"Position: {args.number}  P1: {args.p1}  P2: {args.p2}  Bank: {args.bank}  "
+          f"P{args.turn + 1} to move")
+    for algorithm in ALGORITHMS:
+        move, move_time, nodes = get_computer_move(
+            args.number, args.p1, args.p2, args.bank, algorithm, human_is_player1, args.depth)
+        print(f"{algorithm:<11} best move: {move}  nodes: {nodes:<8} time: {move_time:.6f}s")
+
+    solution = solve_lattice(args.number, args.bank)
+    own_score, other_score = (args.p1, args.p2) if args.turn == 0 else (args.p2, args.p1)
+    margin = own_score - other_score + solution.value()
+    print(f"Exact result for the player to move: final margin {margin:+d}")
+
+
+def command_solve(args):
+    start_time = time.time()
+    solution = solve_lattice(args.number, args.bank)
+    elapsed = time.time() - start_time
+
+    print(f"{args.number} = 2^{solution.twos} * 3^{solution.threes} * {solution.rest}")
+    if solution.best_move() is None:
+        print(f"Game over, margin for the player to move: {solution.value()}")
+    else:
+        print(f"Best move: divide by {solution.best_move()}")
+        print(f"Margin for the player to move: {solution.value()}")
+        print(f"Principal variation: {' '.join(str(move) for move in solution.principal_variation())}")
+    print(f"Solved {solution.cells} lattice cells in {elapsed:.6f}s")
+
+
+def command_tablebase(args):
+    if args.tablebase_command == 'build':
+        start_time = time.time()
+        path = build_tablebase(args.output, args.max_number, args.bank_slots)
+        print(f"Wrote {path} ({os.path.getsize(path)} bytes) "
+              f"in {time.time() - start_time:.2f}s")
+        return
+
+    with Tablebase(args.path) as tablebase:
+        entry = tablebase.lookup(args.number, args.bank)
+    if entry is None:
+        print("Position is outside the tablebase.")
+    elif entry[1] == NO_MOVE:
+        print(f"Game over, margin for the player to move: {entry[0]}")
+    else:
+        print(f"Best move: divide by {entry[1]}, margin for the player to move: {entry[0]}")
+
+
+def command_book(args):
+    if args.book_command == 'build':
+        start_time = time.time()
+        path, count = build_book(args.output, plies=args.plies, depth=args.depth)
+        print(f"Wrote {path} ({count} positions, {os.path.getsize(path)} bytes) "
+              f"in {time.time() - start_time:.2f}s")
+        return
+
+    with OpeningBook(args.path) as book:
+        entry = book.lookup(args.number, args.diff, args.bank)
+    if entry is None:
+        print("Position is not in the opening book.")
+    else:
+        print(f"Book move: divide by {entry[0]}, value {entry[1] / 1000:+.3f} for the player to move")
+
+
+def command_numbers(args):
+    index = start_index()
+    if args.summary:
+        print(f"{'difficulty':<11} " + ' '.join(f"{winner:>7}" for winner in WINNERS))
+        for difficulty in DIFFICULTIES:
+            print(f"{difficulty:<11} " + ' '.join(
+                f"{len(index.matching(difficulty, winner)):>7}" for winner in WINNERS))
+        print(f"{len(index)} start numbers")
+        return
+
+    try:
+        infos = index.draw(args.count, args.difficulty, args.winner, args.seed)
+    except ValueError as exc:
+        print(exc)
+        sys.exit(1)
+    print(f"{'number':>7} {'2s':>3} {'3s':>3} {'value':>6} {'winner':>7} {'length':>7} "
+          f"{'choices':>8} {'critical':>9} difficulty")
+    for info in infos:
+        winner = 'draw' if info.winner is None else ('first', 'second')[info.winner]
+        print(f"{info.number:>7} {info.twos:>3} {info.threes:>3} {info.value:>+6} {winner:>7} "
+              f"{info.length:>7} {info.choices:>8} {info.critical:>9} {info.difficulty}")
+
+
+def command_compare_engines(args):
+    rng = random.Random(args.seed)
+    numbers = []
+    while len(numbers) < args.positions:
+        number = 2 ** rng.randint(8, 20) * 3 ** rng.randint(4, 12) * rng.choice([1, 5, 7, 11])
+        if number not in numbers:
+            numbers.append(number)
+
+    print(f"{'algorithm':<11} {'depth':>5} {'engine':<9} {'nodes':>10} {'seconds':>9} {'nodes/sec':>12}")
+    for algorithm, depth, engine, nodes, elapsed in compare_engines(numbers, args.depths):
+        rate = nodes / elapsed if elapsed > 0 else float('inf')
+        print(f"{algorithm:<11} {depth:>5} {engine:<9} {nodes:>10} {elapsed:>9.4f} {rate:>12.0f}")
+
+
+def command_tournament(args):
+    configs = [parse_config(text) for text in args.configs]
+    start_time = time.time()
+    summary = run_tournament(configs, sample=args.sample, seed=args.seed,
+                             workers=args.workers, output_path=args.output,
+                             records_path=args.records)
+    print(summary.format())
+    print(f"\nFinished in {time.time() - start_time:.2f}s")
+
+
+def command_records(args):
+    if args.records_command == 'show':
+        for record in itertools.islice(read_records(args.path), args.limit):
+            winner = "draw" if record.winner is None else f"P{record.winner + 1} wins"
+            print(f"{time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(record.timestamp))}  "
+                  f"{record.start}  {record.players[0]} vs {record.players[1]}  "
+                  f"{record.final[0]}-{record.final[1]} {winner}  "
+                  f"moves: {''.join(str(move) for move in record.moves)}")
+        return
+
+    start_time = time.time()
+    analysis = analyse_records(args.paths, args.workers, args.limit)
+    print(analysis.format())
+    print(f"\nChecked {analysis.games} games in {time.time() - start_time:.2f}s")
+
+
+def command_benchmark(args):
+    positions = benchmark_positions(args.positions, args.seed)
+    report = run_benchmark(args.engines, args.depths, positions, args.repeat, args.seed)
+    print(format_report(report))
+    if args.output:
+        save_report(report, args.output)
+        print(f"\nWrote {args.output}")
+    if args.baseline:
+        regressions = compare_to_baseline(report, load_report(args.baseline), args.tolerance)
+        if regressions:
+            print(f"\nRegressions against {args.baseline}:")
+            for regression in regressions:
+                print(f"  {regression}")
+            sys.exit(1)
+        print(f"\nNo regressions against {args.baseline}.")
+
+
+def command_parallel(args):
+    positions = benchmark_positions(args.positions, args.seed)
+    results = measure_speedup(positions, args.depth, args.workers, args.split_depth)
+    print(f"serial alpha-beta depth {args.depth}: {results[0]['serial_seconds']:.3f}s "
+          f"over {len(positions)} positions ({os.cpu_count()} cores available)")
+    print(f"{'workers':>7} {'seconds':>9} {'speedup':>8} {'nodes':>10} {'mismatches':>10}")
+    for result in results:
+        print(f"{result['workers']:>7} {result['seconds']:>9.3f} {result['speedup']:>7.2f}x "
+              f"{result['nodes']:>10} {result['mismatches']:>10}")
+    if any(result['mismatches'] for result in results):
+        sys.exit(1)
+
+
+def command_bulk(args):
+    if 'numpy' not in ALGORITHMS:
+        print("Bulk scoring needs NumPy, which is not installed.")
+        sys.exit(1)
+    from .frontier import batch_minimax
+
+    numbers = list(start_numbers())
+    # The computer opens every game, as player 1.
+    positions = [(number, 0, 0, 0, False) for number in numbers]
+    start_time = time.perf_counter()
+    values, moves = batch_minimax(positions, args.depth)
+    elapsed = time.perf_counter() - start_time
+    print(f"Scored {len(positions)} start numbers at depth {args.depth} in {elapsed:.3f}s")
+    print(f"divide by 2: {int((moves == 2).sum())}  divide by 3: {int((moves == 3).sum())}  "
+          f"computer ahead: {int((values > 0).sum())}  behind: {int((values < 0).sum())}")
+    order = values.argsort()
+    for label, indices in (("best", order[::-1][:args.top]), ("worst", order[:args.top])):
+        print(f"{label} for the computer: " +
+              ", ".join(f"{numbers[i]} ({values[i]:+.3f})" for i in indices))
+
+    if args.compare:
+        mismatches = 0
+        start_time = time.perf_counter()
+        for position, move in zip(positions, moves):
+            serial_move, _, _ = get_computer_move(*position[:4], 'minimax', position[4], args.depth)
+            mismatches += serial_move != (int(move) or None)
+        serial_elapsed = time.perf_counter() - start_time
+        print(f"serial minimax: {serial_elapsed:.3f}s ({serial_elapsed / elapsed:.1f}x slower), "
+              f"{mismatches} move mismatches")
+
+
+def _format_weights(weights):
+    return '  '.join(f"{field}={getattr(weights, field):g}" for field in TUNED_FIELDS)
+
+
+def command_tune(args):
+    def report(iteration, weights, result):
+        print(f"[{iteration + 1:>3}/{args.iterations}] {_format_weights(weights)}  "
+              f"match score {result.score():+.3f} over {result.games} games", flush=True)
+
+    # The comparison at the end uses numbers the tuner never trained on.
+    training, held_out = tuning_numbers(args.seed)
+    start_time = time.time()
+    weights = spsa_tune(DEFAULT_WEIGHTS, args.iterations, args.games, args.algorithm, args.depth,
+                        args.seed, args.workers, training, progress=report)
+    print(f"\nTuned in {time.time() - start_time:.1f}s: {_format_weights(weights)}")
+    print(f"Defaults:        {_format_weights(DEFAULT_WEIGHTS)}")
+
+    comparison = compare_weights(weights, DEFAULT_WEIGHTS, held_out, args.algorithm, args.depth,
+                                 args.workers)
+    print(f"Tuned vs defaults over {comparison.games} held-out games: {comparison.wins} W "
+          f"{comparison.draws} D {comparison.losses} L, win rate {comparison.win_rate():.1%}")
+    print(f"Nodes per move: tuned {comparison.nodes_per_move(0):.1f}, "
+          f"defaults {comparison.nodes_per_move(1):.1f}")
+    # The games the GUI actually plays.
+    start_comparison = compare_weights(weights, DEFAULT_WEIGHTS, None, args.algorithm, args.depth,
+                                       args.workers)
+    print(f"Tuned vs defaults over {start_comparison.games} start-number games: "
+          f"{start_comparison.wins} W {start_comparison.draws} D {start_comparison.losses} L, "
+          f"win rate {start_comparison.win_rate():.1%}")
+
+    if args.dry_run:
+        return
+    path = save_weights(weights, args.output, tuning={
+        'method': 'spsa', 'algorithm': args.algorithm, 'depth': args.depth,
+        'iterations': args.iterations, 'games': args.games, 'seed': args.seed,
+    }, comparison=comparison.to_dict(), start_comparison=start_comparison.to_dict())
+    print(f"Wrote {path}")
+
+
+def command_profile(args):
+    number = args.number if args.number is not None else random.choice(start_numbers())
+    profiler = enable_profiling(args.keep)
+    try:
+        record = play_game(number, PlayerConfig(args.algorithm, args.depth),
+                           PlayerConfig(args.algorithm, args.depth))
+    finally:
+        disable_profiling()
+    print(f"Played {number} in {len(record['moves'])} moves, "
+          f"{sum(record['move_time']):.3f}s searching (profiled)")
+    print(profiler.format_summary(args.top))
+    if args.output:
+        for path in profiler.export(args.output):
+            print(f"Wrote {path}")
+
+
+def command_serve(args):
+    try:
+        asyncio.run(serve(args.host, args.port, args.unix, args.workers, args.cache_size))
+    except KeyboardInterrupt:
+        pass
+
+
+def command_loadgen(args):
+    report = asyncio.run(run_loadgen(args.sessions, args.games, args.host, args.port, args.unix,
+                                     args.algorithm, args.depth, args.seed, args.workers))
+    cache = report['cache']
+    print(f"{report['games']} games, {report['moves']} moves over {report['sessions']} sessions "
+          f"in {report['seconds']:.2f}s")
+    print(f"throughput: {report['moves_per_sec']:.1f} moves/sec")
+    print(f"move latency: p50 {report['latency_p50'] * 1000:.2f} ms, "
+          f"p99 {report['latency_p99'] * 1000:.2f} ms")
+    print(f"search cache: {cache['hits']} hits, {cache['joined']} joined in flight, "
+          f"{cache['misses']} searches, {cache['nodes']} nodes")
+
+
+STARTUP_PROBE = (
+    "import time\n"
+    "start = time.perf_counter()\n"
+    "import numberdivision\n"
+    "import sys\n"
+    "print(time.perf_counter() - start, 'tkinter' in sys.modules)\n"
+)
+
+
+def measure_startup(runs=5):
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env['PYTHONPATH'] = os.pathsep.join(filter(None, [package_root, env.get('PYTHONPATH')]))
+    env.pop('PYTHONDONTWRITEBYTECODE', None)
+
+    import_times = []
+    process_times = []
+    loads_tkinter = False
+    for _ in range(runs):
+        start_time = time.perf_counter()
+        output = subprocess.run([sys.executable, '-c', STARTUP_PROBE], env=env,
+                                capture_output=True, text=True, check=True).stdout.split()
+        process_times.append(time.perf_counter() - start_time)
+        import_times.append(float(output[0]))
+        loads_tkinter = loads_tkinter or output[1] == 'True'
+    return statistics.median(import_times), statistics.median(process_times), loads_tkinter
+
+
+def command_startup(args):
+    import_time, process_time, loads_tkinter = measure_startup(args.runs)
+    print(f"import numberdivision: {import_time * 1000:.2f} ms (median of {args.runs})")
+    print(f"interpreter start + import: {process_time * 1000:.2f} ms")
+    print(f"tkinter imported: {'yes' if loads_tkinter else 'no'}")
+    if loads_tkinter:
+        sys.exit(1)
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        prog='python -m numberdivision',
+        description="Headless Number Division Game engine.")
+    subparsers = parser.add_subparsers(dest='command', required=True)
+
+    play_parser = subparsers.add_parser('play', help="play against the computer in the terminal")
+    play_parser.add_argument('--number', type=int,
+                             help=f"starting number (default: random multiple of 6 "
+                                  f"in {MIN_START_NUMBER}-{MAX_START_NUMBER})")
+    play_parser.add_argument('--algorithm', choices=ALGORITHMS, default='alpha-beta')
+    play_parser.add_argument('--depth', type=int,
+                             help=f"search depth (default: {DEFAULT_PLAY_DEPTH}; with "
+                                  f"--time-budget-ms, no limit but the budget)")
+    play_parser.add_argument('--time-budget-ms', type=float,
+                             help="think this long per move, deepening iteratively")
+    play_parser.add_argument('--computer-first', action='store_true')
+    play_parser.add_argument('--no-ponder', action='store_true',
+                             help="do not search the computer's replies while you think")
+    play_parser.add_argument('--no-book', action='store_true',
+                             help="search every move instead of using the opening book")
+    play_parser.add_argument('--records', default=DEFAULT_RECORDS_PATH,
+                             help="game record file to append the game to")
+    play_parser.add_argument('--no-record', action='store_true', help="do not record the game")
+    play_parser.set_defaults(handler=command_play)
+
+    analyse_parser = subparsers.add_parser('analyse', help="show each algorithm's move for a position")
+    analyse_parser.add_argument('number', type=int)
+    analyse_parser.add_argument('--p1', type=int, default=0)
+    analyse_parser.add_argument('--p2', type=int, default=0)
+    analyse_parser.add_argument('--bank', type=int, default=0)
+    analyse_parser.add_argument('--turn', type=int, choices=[0, 1], default=0,
+                                help="0 if player 1 is to move, 1 for player 2")
+    analyse_parser.add_argument('--depth', type=int, default=4)
+    analyse_parser.set_defaults(handler=command_analyse)
+
+    solve_parser = subparsers.add_parser('solve', help="solve a starting number exactly")
+    solve_parser.add_argument('number', type=int)
+    solve_parser.add_argument('--bank', type=int, default=0)
+    solve_parser.set_defaults(handler=command_solve)
+
+    tablebase_parser = subparsers.add_parser('tablebase', help="build or query the endgame tablebase")
+    tablebase_subparsers = tablebase_parser.add_subparsers(dest='tablebase_command', required=True)
+    tablebase_build_parser = tablebase_subparsers.add_parser('build', help="solve every position and write the tablebase")
+    tablebase_build_parser.add_argument('--output', default=DEFAULT_TABLEBASE_PATH)
+    tablebase_build_parser.add_argument('--max-number', type=int, default=DEFAULT_MAX_NUMBER)
+    tablebase_build_parser.add_argument('--bank-slots', type=int, default=DEFAULT_BANK_SLOTS)
+    query_parser = tablebase_subparsers.add_parser('query', help="look up a position")
+    query_parser.add_argument('number', type=int)
+    query_parser.add_argument('bank', type=int, nargs='?', default=0)
+    query_parser.add_argument('--path', default=DEFAULT_TABLEBASE_PATH)
+    tablebase_parser.set_defaults(handler=command_tablebase)
+
+    book_parser = subparsers.add_parser('book', help="build or query the opening book")
+    book_subparsers = book_parser.add_subparsers(dest='book_command', required=True)
+    book_build_parser = book_subparsers.add_parser(
+        'build', help="search the first plies of every start number and write the book")
+    book_build_parser.add_argument('--output', default=DEFAULT_BOOK_PATH)
+    book_build_parser.add_argument('--plies', type=int, default=DEFAULT_BOOK_PLIES)
+    book_build_parser.add_argument('--depth', type=int, default=DEFAULT_BOOK_DEPTH)
+    book_query_parser = book_subparsers.add_parser('query', help="look up a position")
+    book_query_parser.add_argument('number', type=int)
+    book_query_parser.add_argument('--diff', type=int, default=0,
+                                   help="score of the player to move minus the opponent's")
+    book_query_parser.add_argument('--bank', type=int, default=0)
+    book_query_parser.add_argument('--path', default=DEFAULT_BOOK_PATH)
+    book_parser.set_defaults(handler=command_book)
+
+    numbers_parser = subparsers.add_parser(
+        'numbers', help="draw start numbers by difficulty and solved result")
+    numbers_parser.add_argument('--count', type=int, default=5)
+    numbers_parser.add_argument('--difficulty', choices=DIFFICULTIES)
+    numbers_parser.add_argument('--winner', choices=list(WINNERS),
+                                help="who wins the number with best play")
+    numbers_parser.add_argument('--seed', type=int)
+    numbers_parser.add_argument('--summary', action='store_true',
+                                help="count the start numbers for each filter instead")
+    numbers_parser.set_defaults(handler=command_numbers)
+
+    compare_parser = subparsers.add_parser(
+        'compare-engines', help="compare nodes/sec of the GameNode and packed-state engines")
+    compare_parser.add_argument('--positions', type=int, default=100)
+    compare_parser.add_argument('--depths', type=int, nargs='+', default=[4, 8, 12])
+    compare_parser.add_argument('--seed', type=int, default=21)
+    compare_parser.set_defaults(handler=command_compare_engines)
+
+    tournament_parser = subparsers.add_parser(
+        'tournament', help="play every start number between engine configurations")
+    tournament_parser.add_argument('configs', nargs='+', metavar='ALGORITHM:DEPTH',
+                                   help="e.g. minimax:4 alpha-beta:6")
+    tournament_parser.add_argument('--sample', type=int,
+                                   help="play a random sample of start numbers instead of all of them")
+    tournament_parser.add_argument('--seed', type=int)
+    tournament_parser.add_argument('--workers', type=int, help="process count (default: all cores)")
+    tournament_parser.add_argument('--output', help="stream one JSON record per game to this file")
+    tournament_parser.add_argument('--records', help="append every game to this game record file")
+    tournament_parser.set_defaults(handler=command_tournament)
+
+    records_parser = subparsers.add_parser('records', help="list or analyse recorded games")
+    records_subparsers = records_parser.add_subparsers(dest='records_command', required=True)
+    records_show_parser = records_subparsers.add_parser('show', help="print recorded games")
+    records_show_parser.add_argument('path', nargs='?', default=DEFAULT_RECORDS_PATH)
+    records_show_parser.add_argument('--limit', type=int)
+    records_analyse_parser = records_subparsers.add_parser(
+        'analyse', help="check every move against the solved game and summarise each player")
+    records_analyse_parser.add_argument('paths', nargs='*', default=[DEFAULT_RECORDS_PATH])
+    records_analyse_parser.add_argument('--workers', type=int,
+                                        help="process count (default: all cores)")
+    records_analyse_parser.add_argument('--limit', type=int, help="stop after this many games")
+    records_parser.set_defaults(handler=command_records)
+
+    benchmark_parser = subparsers.add_parser(
+        'benchmark', help="benchmark the search engines on a seeded position set")
+    benchmark_parser.add_argument('--engines', nargs='+', default=DEFAULT_ENGINES)
+    benchmark_parser.add_argument('--depths', type=int, nargs='+', default=DEFAULT_DEPTHS)
+    benchmark_parser.add_argument('--positions', type=int, default=DEFAULT_POSITIONS)
+    benchmark_parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    benchmark_parser.add_argument('--repeat', type=int, default=3,
+                                  help="time each search this many times and keep the fastest")
+    benchmark_parser.add_argument('--output', help="write the JSON report to this file")
+    benchmark_parser.add_argument('--baseline', help="JSON report to check for regressions against")
+    benchmark_parser.add_argument('--tolerance', type=float, default=0.15,
+                                  help="allowed relative slowdown in time per move")
+    benchmark_parser.set_defaults(handler=command_benchmark)
+
+    parallel_parser = subparsers.add_parser(
+        'parallel', help="measure the parallel search speedup over serial alpha-beta")
+    parallel_parser.add_argument('--depth', type=int, default=12)
+    parallel_parser.add_argument('--workers', type=int, nargs='+', default=[2, 4, 8])
+    parallel_parser.add_argument('--split-depth', type=int, default=DEFAULT_SPLIT_DEPTH,
+                                 help="plies expanded locally before handing subtrees to the pool")
+    parallel_parser.add_argument('--positions', type=int, default=50)
+    parallel_parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    parallel_parser.set_defaults(handler=command_parallel)
+
+    bulk_parser = subparsers.add_parser(
+        'bulk', help="score every start number at once with the NumPy frontier search")
+    bulk_parser.add_argument('--depth', type=int, default=8)
+    bulk_parser.add_argument('--top', type=int, default=5)
+    bulk_parser.add_argument('--compare', action='store_true',
+                             help="also run serial minimax on each number and check the moves agree")
+    bulk_parser.set_defaults(handler=command_bulk)
+
+    tune_parser = subparsers.add_parser(
+        'tune', help="tune the heuristic weights with SPSA over parallel self-play")
+    tune_parser.add_argument('--iterations', type=int, default=40)
+    tune_parser.add_argument('--games', type=int, default=64, help="games per SPSA iteration")
+    tune_parser.add_argument('--algorithm', choices=ALGORITHMS, default=DEFAULT_TUNING_ALGORITHM)
+    tune_parser.add_argument('--depth', type=int, default=DEFAULT_TUNING_DEPTH)
+    tune_parser.add_argument('--seed', type=int, default=DEFAULT_SEED)
+    tune_parser.add_argument('--workers', type=int, help="process count (default: all cores)")
+    tune_parser.add_argument('--output', default=DEFAULT_WEIGHTS_PATH,
+                             help="weights file to write (the engine loads the default path at startup)")
+    tune_parser.add_argument('--dry-run', action='store_true', help="do not write a weights file")
+    tune_parser.set_defaults(handler=command_tune)
+
+    profile_parser = subparsers.add_parser(
+        'profile', help="profile every computer move of a self-play game")
+    profile_parser.add_argument('--number', type=int)
+    profile_parser.add_argument('--algorithm', choices=ALGORITHMS, default='alpha-beta')
+    profile_parser.add_argument('--depth', type=int, default=8)
+    profile_parser.add_argument('--keep', type=int, default=DEFAULT_PROFILE_CAPACITY,
+                                help="how many of the last moves to keep")
+    profile_parser.add_argument('--top', type=int, default=25, help="functions to list")
+    profile_parser.add_argument('--output', metavar='PREFIX',
+                                help="write PREFIX.folded (collapsed stacks) and PREFIX.txt")
+    profile_parser.set_defaults(handler=command_profile)
+
+    serve_parser = subparsers.add_parser('serve', help="run the JSON-lines game server")
+    serve_parser.add_argument('--host', default=DEFAULT_HOST)
+    serve_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    serve_parser.add_argument('--unix', metavar='PATH', help="listen on a Unix socket instead of TCP")
+    serve_parser.add_argument('--workers', type=int, help="search processes (default: all cores)")
+    serve_parser.add_argument('--cache-size', type=int, default=DEFAULT_CACHE_SIZE)
+    serve_parser.set_defaults(handler=command_serve)
+
+    loadgen_parser = subparsers.add_parser(
+        'loadgen', help="play many concurrent games against the server and report latency")
+    loadgen_parser.add_argument('--sessions', type=int, default=16)
+    loadgen_parser.add_argument('--games', type=int, default=200)
+    loadgen_parser.add_argument('--host', help="server to load (default: start one in-process)")
+    loadgen_parser.add_argument('--port', type=int, default=DEFAULT_PORT)
+    loadgen_parser.add_argument('--unix', metavar='PATH')
+    loadgen_parser.add_argument('--algorithm', choices=ALGORITHMS, default='alpha-beta')
+    loadgen_parser.add_argument('--depth', type=int, default=4)
+    loadgen_parser.add_argument('--seed', type=int)
+    loadgen_parser.add_argument('--workers', type=int, help="search processes for the in-process server")
+    loadgen_parser.set_defaults(handler=command_loadgen)
+
+    startup_parser = subparsers.add_parser('startup', help="measure headless cold start time")
+    startup_parser.add_argument('--runs', type=int, default=5)
+    startup_parser.set_defaults(handler=command_startup)
+
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    args.handler(args)
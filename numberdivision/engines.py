@@ -0,0 +1,29 @@
+from collections import namedtuple
+
+# book is False for engines that do not search the heuristic the opening
+# book was built from, so a book move would override their own choice.
+Engine = namedtuple('Engine', ['name', 'label', 'search', 'ponder', 'book'])
+
+_engines = {}
+
+
+def register(name, label=None, ponder=True, book=True):
+    def decorator(search):
+        _engines[name] = Engine(name, label or name, search, ponder, book)
+        return search
+    return decorator
+
+
+def get_engine(name):
+    engine = _engines.get(name)
+    if engine is None:
+        raise ValueError(f"Unknown search algorithm: {name}")
+    return engine
+
+
+def engine_names():
+    return list(_engines)
+
+
+def registered_engines():
+    return list(_engines.values())
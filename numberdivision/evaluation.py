@@ -0,0 +1,118 @@
+import os
+from collections import namedtuple
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+Weights = namedtuple('Weights', ['terminal_bonus', 'progress_origin', 'progress_scale',
+                                 'three_option', 'bank_weight'])
+
+# The original hand-written constants. Integers keep the default scores
+# bit-identical to the engine before the weights became parameters.
+DEFAULT_WEIGHTS = Weights(terminal_bonus=1000, progress_origin=30000, progress_scale=1000,
+                          three_option=3, bank_weight=1)
+WEIGHTS_VERSION = 1
+DEFAULT_WEIGHTS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'weights.json')
+
+
+def load_weights(path):
+    # json is imported here so that importing the engine without a weights
+    # file does not pay for it.
+    import json
+    with open(path) as f:
+        data = json.load(f)
+    if not isinstance(data, dict) or data.get('version') != WEIGHTS_VERSION:
+        raise ValueError(f"Unsupported weights file: {path}")
+    try:
+        return DEFAULT_WEIGHTS._replace(**data['weights'])
+    except (KeyError, TypeError, ValueError):
+        raise ValueError(f"Invalid weights in {path}")
+
+
+def save_weights(weights, path=DEFAULT_WEIGHTS_PATH, **metadata):
+    import json
+    data = {'version': WEIGHTS_VERSION, 'weights': weights._asdict()}
+    data.update(metadata)
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'w') as f:
+        json.dump(data, f, indent=2)
+    os.replace(tmp_path, path)
+    return path
+
+
+def load_default_weights():
+    if not os.path.exists(DEFAULT_WEIGHTS_PATH):
+        return DEFAULT_WEIGHTS
+    try:
+        return load_weights(DEFAULT_WEIGHTS_PATH)
+    except (OSError, ValueError):
+        return DEFAULT_WEIGHTS
+
+
+_weights = ContextVar('heuristic_weights', default=load_default_weights())
+
+
+def current_weights():
+    return _weights.get()
+
+
+@contextmanager
+def use_weights(weights):
+    token = _weights.set(weights)
+    try:
+        yield weights
+    finally:
+        _weights.reset(token)
+
+
+def heuristic_evaluation(node, human_is_player1):
+    weights = _weights.get()
+    ai_score = node.player2_score if human_is_player1 else node.player1_score
+    human_score = node.player1_score if human_is_player1 else node.player2_score
+
+    if node.number <= 10:
+        final_ai_score = ai_score
+        final_human_score = human_score
+
+        if not node.is_maximizing:
+            final_ai_score += node.game_bank
+        else:
+            final_human_score += node.game_bank
+
+        score_diff = final_ai_score - final_human_score
+        if score_diff > 0:
+            return weights.terminal_bonus + score_diff
+        elif score_diff < 0:
+            return -weights.terminal_bonus + score_diff
+        else:
+            return 0
+
+    score = ai_score - human_score
+    score += node.game_bank * weights.bank_weight
+
+    # A lead counts for more as the number shrinks. Above progress_origin
+    # the term is zero rather than negative, which would turn a lead into a
+    # deficit on long games.
+    progress = max(0, weights.progress_origin - node.number) / weights.progress_scale
+    if score > 0:
+        score += progress
+    elif score < 0:
+        score -= progress
+
+    can_ai_add_3 = False
+    can_human_add_3 = False
+    for move in [2, 3]:
+        if node.number % move == 0:
+            if node.is_maximizing:
+                if move == 3:
+                    can_ai_add_3 = True
+            else:
+                if move == 3:
+                    can_human_add_3 = True
+
+    if can_ai_add_3:
+        score += weights.three_option
+    if can_human_add_3:
+        score -= weights.three_option
+
+    return score
@@ -0,0 +1,157 @@
+import math
+import time
+
+from .evaluation import current_weights
+from .search import get_computer_move
+
+
+class SearchState:
+    __slots__ = ('number', 'score_diff', 'bank', 'is_maximizing', 'nodes')
+
+    def __init__(self, number, score_diff, bank, is_maximizing=True):
+        self.number = number
+        self.score_diff = score_diff
+        self.bank = bank
+        self.is_maximizing = is_maximizing
+        self.nodes = 0
+
+    def apply(self, move):
+        self.number //= move
+        if move == 2:
+            self.score_diff += -2 if self.is_maximizing else 2
+        else:
+            self.score_diff += 3 if self.is_maximizing else -3
+        bank_step = 1 if self.number % 5 == 0 else 0
+        self.bank += bank_step
+        self.is_maximizing = not self.is_maximizing
+        return bank_step
+
+    def undo(self, move, bank_step):
+        self.is_maximizing = not self.is_maximizing
+        self.bank -= bank_step
+        if move == 2:
+            self.score_diff -= -2 if self.is_maximizing else 2
+        else:
+            self.score_diff -= 3 if self.is_maximizing else -3
+        self.number *= move
+
+
+def legal_moves(number):
+    if number % 2 == 0:
+        yield 2
+    if number % 3 == 0:
+        yield 3
+
+
+def evaluate(state):
+    weights = current_weights()
+    number = state.number
+    if number <= 10:
+        if state.is_maximizing:
+            score_diff = state.score_diff - state.bank
+        else:
+            score_diff = state.score_diff + state.bank
+        if score_diff > 0:
+            return weights.terminal_bonus + score_diff
+        elif score_diff < 0:
+            return -weights.terminal_bonus + score_diff
+        return 0
+
+    score = state.score_diff + state.bank * weights.bank_weight
+    progress = max(0, weights.progress_origin - number) / weights.progress_scale
+    if score > 0:
+        score += progress
+    elif score < 0:
+        score -= progress
+
+    if number % 3 == 0:
+        score += weights.three_option if state.is_maximizing else -weights.three_option
+    return score
+
+
+def search(state, depth_left, alpha, beta, use_alpha_beta):
+    state.nodes += 1
+    if state.number <= 10 or depth_left == 0:
+        return evaluate(state)
+
+    if state.is_maximizing:
+        best_score = -math.inf
+        for move in legal_moves(state.number):
+            bank_step = state.apply(move)
+            score = search(state, depth_left - 1, alpha, beta, use_alpha_beta)
+            state.undo(move, bank_step)
+            if score > best_score:
+                best_score = score
+            if use_alpha_beta:
+                if best_score > alpha:
+                    alpha = best_score
+                if beta <= alpha:
+                    break
+    else:
+        best_score = math.inf
+        for move in legal_moves(state.number):
+            bank_step = state.apply(move)
+            score = search(state, depth_left - 1, alpha, beta, use_alpha_beta)
+            state.undo(move, bank_step)
+            if score < best_score:
+                best_score = score
+            if use_alpha_beta:
+                if best_score < beta:
+                    beta = best_score
+                if beta <= alpha:
+                    break
+    return best_score
+
+
+def get_fast_computer_move(current_number, p1_score, p2_score, bank, algorithm, human_is_player1, max_depth=4):
+    start_time = time.time()
+    ai_score = p2_score if human_is_player1 else p1_score
+    human_score = p1_score if human_is_player1 else p2_score
+    state = SearchState(current_number, ai_score - human_score, bank)
+    use_alpha_beta = (algorithm == 'alpha-beta')
+
+    state.nodes += 1
+    best_move = None
+    if current_number > 10 and max_depth > 0:
+        best_score = -math.inf
+        alpha = -math.inf
+        for move in legal_moves(current_number):
+            if best_move is None:
+                best_move = move
+            bank_step = state.apply(move)
+            score = search(state, max_depth - 1, alpha, math.inf, use_alpha_beta)
+            state.undo(move, bank_step)
+            if score > best_score:
+                best_score = score
+                best_move = move
+            if use_alpha_beta:
+                if best_score > alpha:
+                    alpha = best_score
+                if alpha == math.inf:
+                    break
+
+    return best_move, time.time() - start_time, state.nodes
+
+
+def compare_engines(numbers, depths, algorithms=('minimax', 'alpha-beta')):
+    results = []
+    for algorithm in algorithms:
+        for depth in depths:
+            totals = {'GameNode': [0, 0.0], 'packed': [0, 0.0]}
+            for number in numbers:
+                for human_is_player1 in (True, False):
+                    reference = get_computer_move(
+                        number, 0, 0, 0, algorithm, human_is_player1, depth)
+                    fast = get_fast_computer_move(
+                        number, 0, 0, 0, algorithm, human_is_player1, depth)
+                    if reference[0] != fast[0] or reference[2] != fast[2]:
+                        raise AssertionError(
+                            f"Engines disagree on {number} at depth {depth}: {reference} vs {fast}")
+                    totals['GameNode'][0] += reference[2]
+                    totals['GameNode'][1] += reference[1]
+                    totals['packed'][0] += fast[2]
+                    totals['packed'][1] += fast[1]
+            for engine, (nodes, elapsed) in totals.items():
+                results.append((algorithm, depth, engine, nodes, elapsed))
+    return results
+
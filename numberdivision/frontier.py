@@ -0,0 +1,149 @@
+import time
+
+import numpy as np
+
+from .evaluation import current_weights
+from .search import SearchControl, SearchTimeout, max_game_length
+from .stats import SearchStats
+
+MAX_FRONTIER_NUMBER = np.iinfo(np.int64).max
+NO_MOVE = 0
+
+
+def batch_heuristic(number, score_diff, bank, is_maximizing):
+    # heuristic_evaluation over a whole layer. score_diff is the AI's score
+    # minus the human's, and every node in a layer has the same side to move.
+    weights = current_weights()
+    final_diff = score_diff - bank if is_maximizing else score_diff + bank
+    end_value = np.where(final_diff > 0, weights.terminal_bonus + final_diff,
+                         np.where(final_diff < 0, -weights.terminal_bonus + final_diff, 0)
+                         ).astype(np.float64)
+
+    score = (score_diff + bank * weights.bank_weight).astype(np.float64)
+    score += np.sign(score) * (np.maximum(weights.progress_origin - number, 0) /
+                               weights.progress_scale)
+    three_option = weights.three_option if is_maximizing else -weights.three_option
+    score += np.where(number % 3 == 0, three_option, 0)
+    return np.where(number <= 10, end_value, score)
+
+
+def _expand(number, score_diff, bank, is_maximizing):
+    parents = []
+    moves = []
+    children = ([], [], [])
+    active = number > 10
+    for move in (2, 3):
+        index = np.flatnonzero(active & (number % move == 0))
+        child_number = number[index] // move
+        if move == 2:
+            step = -2 if is_maximizing else 2
+        else:
+            step = 3 if is_maximizing else -3
+        parents.append(index)
+        moves.append(np.full(len(index), move, dtype=np.int8))
+        children[0].append(child_number)
+        children[1].append(score_diff[index] + step)
+        children[2].append(bank[index] + (child_number % 5 == 0))
+    return (np.concatenate(parents), np.concatenate(moves),
+            tuple(np.concatenate(arrays) for arrays in children))
+
+
+def batch_minimax(positions, max_depth, stats=None):
+    if stats is None:
+        stats = SearchStats()
+    numbers = [position[0] for position in positions]
+    if numbers and max(numbers) > MAX_FRONTIER_NUMBER:
+        raise ValueError(f"Numbers above {MAX_FRONTIER_NUMBER} do not fit the frontier arrays")
+    score_diffs = [(p2 - p1) if human_is_player1 else (p1 - p2)
+                   for _, p1, p2, _, human_is_player1 in positions]
+    layer = (np.array(numbers, dtype=np.int64),
+             np.array(score_diffs, dtype=np.int64),
+             np.array([position[3] for position in positions], dtype=np.int64))
+
+    layers = [layer]
+    links = []
+    for depth in range(max_depth):
+        parents, moves, children = _expand(*layer, depth % 2 == 0)
+        if len(parents) == 0:
+            break
+        links.append((parents, moves))
+        layers.append(children)
+        layer = children
+
+    child_values = None
+    for depth in range(len(layers) - 1, -1, -1):
+        number, score_diff, bank = layers[depth]
+        is_maximizing = depth % 2 == 0
+        stats.nodes += len(number)
+        stats.nodes_by_depth.extend([0] * (depth + 1 - len(stats.nodes_by_depth)))
+        stats.nodes_by_depth[depth] += len(number)
+
+        leaf = number <= 10
+        if depth == max_depth:
+            leaf = np.ones(len(number), dtype=bool)
+        values = np.full(len(number), -np.inf if is_maximizing else np.inf)
+        if depth < len(links):
+            parents, _ = links[depth]
+            if is_maximizing:
+                np.maximum.at(values, parents, child_values)
+            else:
+                np.minimum.at(values, parents, child_values)
+            has_children = np.zeros(len(number), dtype=bool)
+            has_children[parents] = True
+        else:
+            has_children = np.zeros(len(number), dtype=bool)
+        values = np.where(leaf, batch_heuristic(number, score_diff, bank, is_maximizing), values)
+
+        stats.leaf_evaluations += int(leaf.sum())
+        stats.terminal_hits += int((number <= 10).sum() + (~leaf & ~has_children).sum())
+        if depth == 1:
+            root_child_values = values
+        child_values = values
+
+    best_moves = np.full(len(positions), NO_MOVE, dtype=np.int8)
+    if links:
+        parents, moves = links[0]
+        move_values = {}
+        for move in (2, 3):
+            mask = moves == move
+            present = np.zeros(len(positions), dtype=bool)
+            present[parents[mask]] = True
+            move_value = np.full(len(positions), -np.inf)
+            move_value[parents[mask]] = root_child_values[mask]
+            move_values[move] = (present, move_value)
+        has_two, two_value = move_values[2]
+        has_three, three_value = move_values[3]
+        best_moves = np.where(has_two & (~has_three | (two_value >= three_value)), 2,
+                              np.where(has_three, 3, NO_MOVE)).astype(np.int8)
+    return child_values, best_moves
+
+
+def frontier_search(current_number, p1_score, p2_score, bank, human_is_player1, max_depth,
+                    time_budget_ms=None, control=None, stats=None):
+    position = [(current_number, p1_score, p2_score, bank, human_is_player1)]
+    if time_budget_ms is None and control is None:
+        move = batch_minimax(position, max_depth, stats)[1][0]
+        return int(move) if move != NO_MOVE else None
+
+    # Each layer is a single NumPy call, so a search can only be abandoned
+    # between depths: deepen one ply at a time and keep the last full result.
+    if control is None:
+        control = SearchControl()
+    if time_budget_ms is not None:
+        control.deadline = time.perf_counter() + time_budget_ms / 1000
+    best_move = None
+    for depth in range(1, min(max_depth, max_game_length(current_number)) + 1):
+        try:
+            control.check_limits()
+        except SearchTimeout:
+            break
+        iteration_start = time.perf_counter()
+        iteration_nodes = stats.nodes if stats is not None else 0
+        move = batch_minimax(position, depth, stats)[1][0]
+        if stats is not None:
+            stats.record_iteration(depth, time.perf_counter() - iteration_start,
+                                   stats.nodes - iteration_nodes)
+        best_move = int(move) if move != NO_MOVE else None
+        control.completed_depth = depth
+        control.armed = True
+    return best_move
@@ -0,0 +1,101 @@
+import time
+
+
+def factor_number(number):
+    twos = 0
+    threes = 0
+    rest = number
+    while rest > 0 and rest % 2 == 0:
+        rest //= 2
+        twos += 1
+    while rest > 0 and rest % 3 == 0:
+        rest //= 3
+        threes += 1
+    return twos, threes, rest
+
+
+class LatticeSolution:
+    # A position is fully described by how many factors of 2 and 3 are left:
+    # dividing never changes the rest of the number, so it never changes
+    # whether a move adds to the bank either. values[i][j] is the best margin
+    # the player to move can force with i twos and j threes remaining.
+    def __init__(self, number, bank=0):
+        if number < 1:
+            raise ValueError(f"Starting number must be positive, got {number}")
+        self.number = number
+        self.bank = bank
+        self.twos, self.threes, self.rest = factor_number(number)
+        self.bank_step = 1 if self.rest % 5 == 0 else 0
+        self.values = []
+        self.moves = []
+        self._solve()
+
+    @property
+    def cells(self):
+        return (self.twos + 1) * (self.threes + 1)
+
+    def _solve(self):
+        twos = self.twos
+        threes = self.threes
+        powers_of_three = [1] * (threes + 1)
+        for j in range(1, threes + 1):
+            powers_of_three[j] = powers_of_three[j - 1] * 3
+
+        power_of_two = 1
+        for i in range(twos + 1):
+            row_values = [0] * (threes + 1)
+            row_moves = [None] * (threes + 1)
+            for j in range(threes + 1):
+                number = self.rest * power_of_two * powers_of_three[j]
+                moves_made = (twos - i) + (threes - j)
+                bank = self.bank + moves_made * self.bank_step
+
+                if number <= 10 or (i == 0 and j == 0):
+                    row_values[j] = -bank
+                    continue
+
+                best_value = None
+                best_move = None
+                if i > 0:
+                    best_value = -2 - self.values[i - 1][j]
+                    best_move = 2
+                if j > 0:
+                    value = 3 - row_values[j - 1]
+                    if best_value is None or value > best_value:
+                        best_value = value
+                        best_move = 3
+                row_values[j] = best_value
+                row_moves[j] = best_move
+            self.values.append(row_values)
+            self.moves.append(row_moves)
+            power_of_two *= 2
+
+    def value(self):
+        return self.values[self.twos][self.threes]
+
+    def best_move(self):
+        return self.moves[self.twos][self.threes]
+
+    def principal_variation(self):
+        line = []
+        i, j = self.twos, self.threes
+        move = self.moves[i][j]
+        while move is not None:
+            line.append(move)
+            if move == 2:
+                i -= 1
+            else:
+                j -= 1
+            move = self.moves[i][j]
+        return line
+
+
+def solve_lattice(number, bank=0):
+    return LatticeSolution(number, bank)
+
+
+def get_lattice_move(current_number, bank):
+    start_time = time.time()
+    solution = LatticeSolution(current_number, bank)
+    return solution.best_move(), time.time() - start_time, solution.cells
+
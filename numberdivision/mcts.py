@@ -0,0 +1,166 @@
+import math
+import random
+import time
+
+from .engines import register
+from .rules import legal_moves
+
+EXPLORATION = math.sqrt(2)
+ITERATIONS_PER_PLY = 250
+
+
+def _play(number, score_diff, bank, is_maximizing, move):
+    # score_diff is the AI's score minus the human's, as in SearchState.
+    number //= move
+    if move == 2:
+        score_diff += -2 if is_maximizing else 2
+    else:
+        score_diff += 3 if is_maximizing else -3
+    if number % 5 == 0:
+        bank += 1
+    return number, score_diff, bank
+
+
+def final_result(score_diff, bank, is_maximizing):
+    # The bank goes to whoever moved last, which is the side not to move.
+    final_diff = score_diff - bank if is_maximizing else score_diff + bank
+    if final_diff > 0:
+        return 1.0
+    if final_diff < 0:
+        return 0.0
+    return 0.5
+
+
+def playout(number, score_diff, bank, is_maximizing, rng):
+    steps = 0
+    moves = legal_moves(number)
+    while moves:
+        move = moves[0] if len(moves) == 1 else rng.choice(moves)
+        number, score_diff, bank = _play(number, score_diff, bank, is_maximizing, move)
+        is_maximizing = not is_maximizing
+        moves = legal_moves(number)
+        steps += 1
+    return final_result(score_diff, bank, is_maximizing), steps
+
+
+class MctsNode:
+    __slots__ = ('number', 'score_diff', 'bank', 'is_maximizing', 'parent', 'move',
+                 'children', 'untried', 'visits', 'wins')
+
+    def __init__(self, number, score_diff, bank, is_maximizing, parent=None, move=None):
+        self.number = number
+        self.score_diff = score_diff
+        self.bank = bank
+        self.is_maximizing = is_maximizing
+        self.parent = parent
+        self.move = move
+        self.children = []
+        self.untried = legal_moves(number)
+        self.visits = 0
+        # Results for the player who moved into this node.
+        self.wins = 0.0
+
+    def expand(self):
+        move = self.untried.pop(0)
+        child = MctsNode(*_play(self.number, self.score_diff, self.bank, self.is_maximizing, move),
+                         not self.is_maximizing, self, move)
+        self.children.append(child)
+        return child
+
+    def select_child(self, exploration):
+        log_visits = math.log(self.visits)
+        return max(self.children, key=lambda child: child.wins / child.visits +
+                   exploration * math.sqrt(log_visits / child.visits))
+
+
+def run_mcts(number, score_diff, bank, iterations=None, deadline=None, control=None, seed=None,
+             exploration=EXPLORATION):
+    rng = random.Random(seed)
+    root = MctsNode(number, score_diff, bank, True)
+    nodes = 0
+    playouts = 0
+    while iterations is None or playouts < iterations:
+        if deadline is not None and time.time() >= deadline:
+            break
+        if control is not None and control.limit_reached():
+            break
+
+        node = root
+        while not node.untried and node.children:
+            node = node.select_child(exploration)
+            nodes += 1
+        if node.untried:
+            node = node.expand()
+            nodes += 1
+        result, steps = playout(node.number, node.score_diff, node.bank, node.is_maximizing, rng)
+        nodes += steps
+        playouts += 1
+
+        while node is not None:
+            node.visits += 1
+            if node.parent is not None:
+                node.wins += result if node.parent.is_maximizing else 1.0 - result
+            node = node.parent
+
+    root_stats = {child.move: (child.visits, child.wins) for child in root.children}
+    return root_stats, nodes, playouts
+
+
+def _mcts_job(number, score_diff, bank, iterations, deadline, seed):
+    return run_mcts(number, score_diff, bank, iterations, deadline, seed=seed)
+
+
+@register('mcts', 'MCTS', ponder=False, book=False)
+def search_mcts(current_number, p1_score, p2_score, bank, human_is_player1, max_depth,
+                tt=None, time_budget_ms=None, control=None, stats=None, workers=None, seed=None):
+    # Root parallel: every worker grows its own tree from the root and the
+    # visit counts are summed. Without a time budget the search size scales
+    # with max_depth so the engine can be configured like the others.
+    if not legal_moves(current_number):
+        return None
+    ai_score = p2_score if human_is_player1 else p1_score
+    human_score = p1_score if human_is_player1 else p2_score
+    score_diff = ai_score - human_score
+    if workers is None:
+        from .parallel import default_workers
+        workers = default_workers()
+    rng = random.Random(seed)
+
+    deadline = None
+    iterations = None
+    if time_budget_ms is not None:
+        deadline = time.time() + time_budget_ms / 1000
+    else:
+        iterations = max(1, ITERATIONS_PER_PLY * max_depth // workers)
+
+    futures = []
+    if workers > 1:
+        from .parallel import get_pool
+        # The pool is shared with the parallel engine and rebuilt whenever
+        # its size changes, so ask for the same size and leave one worker
+        # idle while this process grows the last tree.
+        pool = get_pool(workers)
+        futures = [pool.submit(_mcts_job, current_number, score_diff, bank, iterations, deadline,
+                               rng.random())
+                   for _ in range(workers - 1)]
+    results = [run_mcts(current_number, score_diff, bank, iterations, deadline, control, rng.random())]
+    for future in futures:
+        if control is not None and control.stopped:
+            future.cancel()
+            continue
+        results.append(future.result())
+
+    visits = {}
+    for root_stats, nodes, playouts in results:
+        for move, (move_visits, _) in root_stats.items():
+            visits[move] = visits.get(move, 0) + move_visits
+        if stats is not None:
+            stats.nodes += nodes
+            stats.leaf_evaluations += playouts
+            stats.terminal_hits += playouts
+
+    best_move = None
+    for move in legal_moves(current_number):
+        if best_move is None or visits.get(move, 0) > visits.get(best_move, 0):
+            best_move = move
+    return best_move
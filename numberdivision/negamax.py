@@ -0,0 +1,203 @@
+import math
+import time
+
+from .engines import register
+from .fast_search import SearchState, evaluate, legal_moves
+from .search import SearchControl, SearchTimeout, max_game_length
+from .transposition import TT_EXACT, TT_LOWER, TT_UPPER, TranspositionTable
+
+# The heuristic works in steps of 1/1000, so scaling it gives integer scores
+# with the same ordering. Null windows (alpha, alpha + 1) need integers.
+# Weights from a weights file keep this as long as terminal_bonus,
+# three_option and bank_weight are multiples of 1/1000 and progress_scale
+# divides 1000; tuning.py only writes such weights.
+SCALE = 1000
+WIN_SCORE = 10 ** 9
+TT_TAG = 'negamax'
+
+
+def scaled_evaluation(state):
+    value = round(evaluate(state) * SCALE)
+    return value if state.is_maximizing else -value
+
+
+def _tt_key(state, depth_left):
+    # Same layout as TranspositionTable.make_key plus a tag, so negamax
+    # scores never mix with minimax scores stored in a shared table.
+    return (state.number, state.score_diff, state.bank, state.is_maximizing, depth_left, TT_TAG)
+
+
+def _ordered_moves(state, tt_move):
+    moves = list(legal_moves(state.number))
+    if len(moves) == 2 and tt_move == moves[1]:
+        moves.reverse()
+    return moves
+
+
+def alpha_beta(state, depth_left, alpha, beta, ply=0, tt=None, control=None, stats=None, pvs=False):
+    if stats is not None:
+        stats.enter_node(state, ply)
+    if control is not None:
+        control.check_limits()
+
+    if state.number <= 10 or depth_left == 0:
+        if control is not None and state.number > 10:
+            control.horizon_reached = True
+        value = scaled_evaluation(state)
+        if stats is not None:
+            stats.record_leaf(state.number <= 10)
+            stats.exit_node(state, ply, value)
+        return value, None
+
+    tt_key = None
+    tt_move = None
+    if tt is not None:
+        tt_key = _tt_key(state, depth_left)
+        entry = tt.probe(tt_key)
+        if entry is not None:
+            value, flag, tt_move = entry
+            if flag == TT_EXACT or \
+                    (flag == TT_LOWER and value >= beta) or \
+                    (flag == TT_UPPER and value <= alpha):
+                if control is not None:
+                    control.horizon_reached = True
+                if stats is not None:
+                    stats.exit_node(state, ply, value)
+                return value, tt_move
+
+    moves = _ordered_moves(state, tt_move)
+    if not moves:
+        if stats is not None:
+            stats.record_terminal()
+            stats.exit_node(state, ply, -WIN_SCORE)
+        return -WIN_SCORE, None
+
+    alpha_orig = alpha
+    best_score = -math.inf
+    best_move = moves[0]
+    for index, move in enumerate(moves):
+        bank_step = state.apply(move)
+        if pvs and index > 0:
+            score = -alpha_beta(state, depth_left - 1, -alpha - 1, -alpha,
+                                ply + 1, tt, control, stats, pvs)[0]
+            if alpha < score < beta:
+                score = -alpha_beta(state, depth_left - 1, -beta, -score,
+                                    ply + 1, tt, control, stats, pvs)[0]
+        else:
+            score = -alpha_beta(state, depth_left - 1, -beta, -alpha,
+                                ply + 1, tt, control, stats, pvs)[0]
+        state.undo(move, bank_step)
+        if score > best_score:
+            best_score = score
+            best_move = move
+        if best_score > alpha:
+            alpha = best_score
+        if alpha >= beta:
+            if stats is not None:
+                stats.record_cutoff(ply, alpha, beta)
+            break
+
+    if tt is not None:
+        if best_score <= alpha_orig:
+            flag = TT_UPPER
+        elif best_score >= beta:
+            flag = TT_LOWER
+        else:
+            flag = TT_EXACT
+        tt.store(tt_key, best_score, flag, best_move)
+    if stats is not None:
+        stats.exit_node(state, ply, best_score)
+    return best_score, best_move
+
+
+def mtdf(state, depth, guess, tt, control=None, stats=None):
+    lower = -math.inf
+    upper = math.inf
+    value = guess
+    best_move = None
+    while lower < upper:
+        beta = value + 1 if value == lower else value
+        value, move = alpha_beta(state, depth, beta - 1, beta, 0, tt, control, stats)
+        if value < beta:
+            upper = value
+        else:
+            lower = value
+            best_move = move
+    return value, best_move
+
+
+def _root_state(current_number, p1_score, p2_score, bank, human_is_player1):
+    ai_score = p2_score if human_is_player1 else p1_score
+    human_score = p1_score if human_is_player1 else p2_score
+    return SearchState(current_number, ai_score - human_score, bank)
+
+
+def _deepen(search_depth, current_number, p1_score, p2_score, bank, human_is_player1, max_depth,
+            time_budget_ms, control, stats):
+    if control is None:
+        control = SearchControl()
+    if time_budget_ms is not None:
+        control.deadline = time.perf_counter() + time_budget_ms / 1000
+    max_depth = min(max_depth, max_game_length(current_number))
+    best_move = None
+    guess = 0
+    for depth in range(1, max_depth + 1):
+        control.horizon_reached = False
+        state = _root_state(current_number, p1_score, p2_score, bank, human_is_player1)
+        iteration_start = time.perf_counter()
+        iteration_nodes = stats.nodes if stats is not None else 0
+        try:
+            guess, move = search_depth(state, depth, guess, control)
+        except SearchTimeout:
+            break
+        if stats is not None:
+            stats.record_iteration(depth, time.perf_counter() - iteration_start,
+                                   stats.nodes - iteration_nodes)
+        best_move = move
+        control.completed_depth = depth
+        control.armed = True
+        if not control.horizon_reached or control.limit_reached():
+            break
+    return best_move
+
+
+@register('negamax', 'Negamax')
+def search_negamax(current_number, p1_score, p2_score, bank, human_is_player1, max_depth,
+                   tt=None, time_budget_ms=None, control=None, stats=None):
+    def search_depth(state, depth, guess, control):
+        return alpha_beta(state, depth, -math.inf, math.inf, 0, tt, control, stats)
+
+    if time_budget_ms is None and control is None:
+        state = _root_state(current_number, p1_score, p2_score, bank, human_is_player1)
+        return search_depth(state, max_depth, 0, None)[1]
+    return _deepen(search_depth, current_number, p1_score, p2_score, bank, human_is_player1,
+                   max_depth, time_budget_ms, control, stats)
+
+
+@register('pvs', 'PVS')
+def search_pvs(current_number, p1_score, p2_score, bank, human_is_player1, max_depth,
+               tt=None, time_budget_ms=None, control=None, stats=None):
+    def search_depth(state, depth, guess, control):
+        return alpha_beta(state, depth, -math.inf, math.inf, 0, tt, control, stats, pvs=True)
+
+    if time_budget_ms is None and control is None:
+        state = _root_state(current_number, p1_score, p2_score, bank, human_is_player1)
+        return search_depth(state, max_depth, 0, None)[1]
+    return _deepen(search_depth, current_number, p1_score, p2_score, bank, human_is_player1,
+                   max_depth, time_budget_ms, control, stats)
+
+
+@register('mtdf', 'MTD(f)')
+def search_mtdf(current_number, p1_score, p2_score, bank, human_is_player1, max_depth,
+                tt=None, time_budget_ms=None, control=None, stats=None):
+    # MTD(f) is only efficient with a memory of earlier passes, so it brings
+    # its own table when the caller has none, and always deepens iteratively
+    # so each depth starts from the previous depth's value.
+    if tt is None:
+        tt = TranspositionTable()
+
+    def search_depth(state, depth, guess, control):
+        return mtdf(state, depth, guess, tt, control, stats)
+
+    return _deepen(search_depth, current_number, p1_score, p2_score, bank, human_is_player1,
+                   max_depth, time_budget_ms, control, stats)
@@ -0,0 +1,207 @@
+import atexit
+import math
+import multiprocessing
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ProcessPoolExecutor, wait
+
+from .search import GameNode, SearchControl, SearchTimeout, max_game_length, minimax
+from .stats import SearchStats
+
+DEFAULT_SPLIT_DEPTH = 3
+POLL_SECONDS = 0.02
+
+_pool = None
+_pool_workers = None
+
+
+def default_workers():
+    # Inside a tournament or server worker process every core already runs
+    # a search, so a nested pool of cpu_count processes would oversubscribe
+    # the machine cores-squared times over.
+    if multiprocessing.parent_process() is not None:
+        return 1
+    return os.cpu_count() or 1
+
+
+def get_pool(workers=None):
+    global _pool, _pool_workers
+    workers = workers or default_workers()
+    if _pool is None or _pool_workers != workers:
+        shutdown_pool()
+        _pool = ProcessPoolExecutor(max_workers=workers,
+                                    mp_context=multiprocessing.get_context('spawn'))
+        _pool_workers = workers
+    return _pool
+
+
+def shutdown_pool():
+    global _pool, _pool_workers
+    if _pool is not None:
+        _pool.shutdown(wait=True, cancel_futures=True)
+    _pool = None
+    _pool_workers = None
+
+
+atexit.register(shutdown_pool)
+
+
+def _ready():
+    return os.getpid()
+
+
+def warm_pool(workers=None):
+    pool = get_pool(workers)
+    for future in [pool.submit(_ready) for _ in range(_pool_workers)]:
+        future.result()
+    return pool
+
+
+def _node_turn(node, human_is_player1):
+    if human_is_player1:
+        return 1 if node.is_maximizing else 0
+    return 0 if node.is_maximizing else 1
+
+
+def _search_subtree(node, max_depth, human_is_player1, time_budget_s):
+    stats = SearchStats()
+    control = None
+    if time_budget_s is not None:
+        control = SearchControl(time.perf_counter() + time_budget_s)
+        control.armed = True
+    try:
+        value = minimax(node, node.depth, -math.inf, math.inf,
+                        True, human_is_player1, max_depth, None, control, stats)
+    except SearchTimeout:
+        value = None
+    return value, stats
+
+
+def _split(node, human_is_player1, max_depth, split_depth, values, jobs, stats):
+    # Expand the top of the tree in this process. Every node at the split
+    # depth becomes a job searched with a full window, so the values that
+    # come back are exact and the backed up move matches the serial search.
+    if node.number > 10 and node.depth < max_depth:
+        if node.depth >= split_depth:
+            jobs.append(node)
+            return
+        node.generate_children(_node_turn(node, human_is_player1), human_is_player1)
+        if node.children:
+            stats.enter_node(node, node.depth)
+            for _, child in node.children:
+                _split(child, human_is_player1, max_depth, split_depth, values, jobs, stats)
+            return
+    values[node] = minimax(node, node.depth, -math.inf, math.inf,
+                           True, human_is_player1, max_depth, None, None, stats)
+
+
+def _backup(node, values):
+    if node in values:
+        return values[node]
+    best_score = None
+    for move, child in node.children:
+        score = _backup(child, values)
+        if best_score is None or \
+                (score > best_score if node.is_maximizing else score < best_score):
+            best_score = score
+            node.best_move = move
+    return best_score
+
+
+def _parallel_iteration(root, human_is_player1, max_depth, split_depth, pool, control, stats):
+    values = {}
+    jobs = []
+    _split(root, human_is_player1, max_depth, split_depth, values, jobs, stats)
+
+    time_budget_s = None
+    if control is not None and control.deadline is not None:
+        time_budget_s = max(0.0, control.deadline - time.perf_counter())
+    futures = {pool.submit(_search_subtree, node, max_depth, human_is_player1, time_budget_s): node
+               for node in jobs}
+    pending = set(futures)
+    while pending:
+        done, pending = wait(pending, timeout=POLL_SECONDS, return_when=FIRST_COMPLETED)
+        for future in done:
+            value, subtree_stats = future.result()
+            stats.merge(subtree_stats)
+            if value is None:
+                raise SearchTimeout()
+            values[futures[future]] = value
+        if pending and control is not None and control.armed and control.limit_reached():
+            for future in pending:
+                future.cancel()
+            raise SearchTimeout()
+    return _backup(root, values)
+
+
+def parallel_search(current_number, p1_score, p2_score, bank, human_is_player1, max_depth=4,
+                    workers=None, split_depth=DEFAULT_SPLIT_DEPTH, time_budget_ms=None,
+                    control=None, stats=None):
+    if stats is None:
+        stats = SearchStats()
+    pool = get_pool(workers)
+
+    if time_budget_ms is None and control is None:
+        root = GameNode(current_number, p1_score, p2_score, bank, 0, True)
+        _parallel_iteration(root, human_is_player1, max_depth, split_depth, pool, None, stats)
+        return root.best_move
+
+    if control is None:
+        control = SearchControl()
+    if time_budget_ms is not None:
+        control.deadline = time.perf_counter() + time_budget_ms / 1000
+    max_depth = min(max_depth, max_game_length(current_number))
+    best_move = None
+    for depth in range(1, max_depth + 1):
+        root = GameNode(current_number, p1_score, p2_score, bank, 0, True)
+        iteration_start = time.perf_counter()
+        iteration_nodes = stats.nodes
+        try:
+            _parallel_iteration(root, human_is_player1, depth, split_depth, pool, control, stats)
+        except SearchTimeout:
+            break
+        stats.record_iteration(depth, time.perf_counter() - iteration_start,
+                               stats.nodes - iteration_nodes)
+        best_move = root.best_move
+        control.completed_depth = depth
+        control.armed = True
+        if control.limit_reached():
+            break
+    return best_move
+
+
+def measure_speedup(positions, depth, worker_counts=(2, 4, 8), split_depth=DEFAULT_SPLIT_DEPTH):
+    from .search import get_computer_move
+
+    serial_moves = []
+    serial_time = 0.0
+    for number, p1_score, p2_score, bank, human_is_player1 in positions:
+        start_time = time.perf_counter()
+        move, _, _ = get_computer_move(number, p1_score, p2_score, bank, 'alpha-beta',
+                                       human_is_player1, depth)
+        serial_time += time.perf_counter() - start_time
+        serial_moves.append(move)
+
+    results = []
+    for workers in worker_counts:
+        warm_pool(workers)
+        stats = SearchStats()
+        mismatches = 0
+        start_time = time.perf_counter()
+        for position, serial_move in zip(positions, serial_moves):
+            number, p1_score, p2_score, bank, human_is_player1 = position
+            move = parallel_search(number, p1_score, p2_score, bank, human_is_player1, depth,
+                                   workers, split_depth, stats=stats)
+            if move != serial_move:
+                mismatches += 1
+        elapsed = time.perf_counter() - start_time
+        results.append({
+            'workers': workers,
+            'seconds': elapsed,
+            'serial_seconds': serial_time,
+            'speedup': serial_time / elapsed if elapsed > 0 else None,
+            'nodes': stats.nodes,
+            'mismatches': mismatches,
+        })
+    shutdown_pool()
+    return results
@@ -0,0 +1,147 @@
+import os
+import sys
+import time
+from collections import deque, namedtuple
+from contextlib import contextmanager
+
+from .search import set_profiler
+
+DEFAULT_PROFILE_CAPACITY = 32
+
+# stacks maps a call stack (a tuple of function names, outermost first) to
+# the seconds spent in its innermost function. functions maps a function
+# name to [calls, own seconds, seconds including callees].
+MoveProfile = namedtuple('MoveProfile', ['label', 'seconds', 'stacks', 'functions'])
+
+
+def _code_name(code):
+    name = getattr(code, 'co_qualname', code.co_name)
+    return f"{name} ({os.path.basename(code.co_filename)}:{code.co_firstlineno})"
+
+
+def _builtin_name(function):
+    module = getattr(function, '__module__', None) or 'builtins'
+    return f"{module}.{getattr(function, '__qualname__', repr(function))}"
+
+
+class _Tracer:
+    def __init__(self):
+        self.frames = []
+        self.stacks = {}
+        self.functions = {}
+
+    def __call__(self, frame, event, arg):
+        now = time.perf_counter()
+        if event == 'call':
+            self.frames.append([_code_name(frame.f_code), now, 0.0])
+        elif event == 'c_call':
+            self.frames.append([_builtin_name(arg), now, 0.0])
+        elif self.frames:
+            # Returns from frames entered before tracing began find the
+            # stack empty and are ignored.
+            name, start, callees = self.frames.pop()
+            elapsed = now - start
+            path = tuple(entry[0] for entry in self.frames) + (name,)
+            self.stacks[path] = self.stacks.get(path, 0.0) + elapsed - callees
+            function = self.functions.setdefault(name, [0, 0.0, 0.0])
+            function[0] += 1
+            function[1] += elapsed - callees
+            if name not in path[:-1]:
+                # Only the outermost call of a recursion counts towards the
+                # inclusive time.
+                function[2] += elapsed
+            if self.frames:
+                self.frames[-1][2] += elapsed
+
+
+class Profiler:
+    def __init__(self, capacity=DEFAULT_PROFILE_CAPACITY):
+        self.profiles = deque(maxlen=capacity)
+        self.count = 0
+
+    def __len__(self):
+        return len(self.profiles)
+
+    def clear(self):
+        self.profiles.clear()
+
+    @contextmanager
+    def capture(self, label):
+        # sys.setprofile only covers the calling thread, so a search running
+        # in a worker thread is profiled from inside that thread. A capture
+        # inside another one just runs.
+        if sys.getprofile() is not None:
+            yield
+            return
+        tracer = _Tracer()
+        start_time = time.perf_counter()
+        sys.setprofile(tracer)
+        try:
+            yield
+        finally:
+            sys.setprofile(None)
+            self.count += 1
+            self.profiles.append(MoveProfile(f"{self.count}: {label}",
+                                             time.perf_counter() - start_time,
+                                             tracer.stacks, tracer.functions))
+
+    def profile_move(self, search, current_number, p1_score, p2_score, bank, algorithm,
+                     human_is_player1, max_depth, *args):
+        with self.capture(f"{algorithm} {current_number} depth {max_depth}"):
+            return search(current_number, p1_score, p2_score, bank, algorithm, human_is_player1,
+                          max_depth, *args)
+
+    def collapsed_stacks(self):
+        # One line per stack in the folded format that flamegraph.pl and
+        # speedscope read, with the move as the root frame and microseconds
+        # as the sample count.
+        lines = []
+        for profile in self.profiles:
+            root = profile.label.replace(';', ',')
+            for path, seconds in profile.stacks.items():
+                micros = round(seconds * 1e6)
+                if micros > 0:
+                    frames = ';'.join(name.replace(';', ',') for name in path)
+                    lines.append(f"{root};{frames} {micros}")
+        return lines
+
+    def hot_functions(self):
+        totals = {}
+        for profile in self.profiles:
+            for name, (calls, own, inclusive) in profile.functions.items():
+                function = totals.setdefault(name, [0, 0.0, 0.0])
+                function[0] += calls
+                function[1] += own
+                function[2] += inclusive
+        return sorted(((name, calls, own, inclusive)
+                       for name, (calls, own, inclusive) in totals.items()),
+                      key=lambda entry: entry[2], reverse=True)
+
+    def format_summary(self, limit=25):
+        profiled = sum(profile.seconds for profile in self.profiles)
+        lines = [f"{len(self.profiles)} profiles, {profiled:.3f}s",
+                 f"{'own ms':>10} {'own %':>6} {'total ms':>10} {'calls':>10}  function"]
+        for name, calls, own, inclusive in self.hot_functions()[:limit]:
+            share = own / profiled if profiled > 0 else 0.0
+            lines.append(f"{own * 1000:>10.2f} {share:>6.1%} {inclusive * 1000:>10.2f} "
+                         f"{calls:>10}  {name}")
+        return '\n'.join(lines)
+
+    def export(self, prefix):
+        folded_path = prefix + '.folded'
+        summary_path = prefix + '.txt'
+        with open(folded_path, 'w') as f:
+            f.writelines(line + '\n' for line in self.collapsed_stacks())
+        with open(summary_path, 'w') as f:
+            f.write(self.format_summary(limit=None) + '\n')
+        return folded_path, summary_path
+
+
+def enable_profiling(capacity=DEFAULT_PROFILE_CAPACITY):
+    profiler = Profiler(capacity)
+    set_profiler(profiler)
+    return profiler
+
+
+def disable_profiling():
+    set_profiler(None)
@@ -0,0 +1,358 @@
+import itertools
+import os
+import struct
+import time
+from collections import deque, namedtuple
+
+from .lattice_solver import LatticeSolution
+from .rules import GameState
+
+RECORDS_MAGIC = b'NDGR'
+RECORDS_VERSION = 1
+FILE_HEADER_FORMAT = '<4sH'
+FILE_HEADER_SIZE = struct.calcsize(FILE_HEADER_FORMAT)
+# Every record is its body length followed by the body: timestamp and winner
+# (-1 for a draw), then start number, final scores and move count as varints
+# (start numbers have no upper bound), then the two player labels and the
+# divisors, move times (microseconds) and node counts as three columns.
+LENGTH_FORMAT = '<I'
+LENGTH_SIZE = struct.calcsize(LENGTH_FORMAT)
+RECORD_FORMAT = '<db'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+MAX_COUNTER = 0xFFFFFFFF
+
+DEFAULT_BUFFER_SIZE = 1 << 16
+DEFAULT_RECORDS_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'games.rec')
+DEFAULT_ANALYSIS_BATCH = 512
+# Latency bucket k holds move times below 2**k microseconds.
+LATENCY_BUCKETS = 32
+
+GameRecord = namedtuple('GameRecord', ['start', 'players', 'moves', 'move_times', 'move_nodes',
+                                       'final', 'winner', 'timestamp'])
+
+
+def game_record(start, players, moves, move_times, move_nodes, final, timestamp=None):
+    p1_final, p2_final = final
+    if p1_final > p2_final:
+        winner = 0
+    elif p2_final > p1_final:
+        winner = 1
+    else:
+        winner = None
+    return GameRecord(start, tuple(players), list(moves), list(move_times), list(move_nodes),
+                      (p1_final, p2_final), winner, time.time() if timestamp is None else timestamp)
+
+
+def _encode_varint(value):
+    if value < 0:
+        raise ValueError(f"Cannot store a negative value in a game record: {value}")
+    out = bytearray()
+    while value >= 0x80:
+        out.append(value & 0x7F | 0x80)
+        value >>= 7
+    out.append(value)
+    return bytes(out)
+
+
+def _decode_varint(body, offset):
+    value = 0
+    shift = 0
+    while True:
+        byte = body[offset]
+        offset += 1
+        value |= (byte & 0x7F) << shift
+        if byte < 0x80:
+            return value, offset
+        shift += 7
+
+
+def encode_record(record):
+    count = len(record.moves)
+    if len(record.move_times) != count or len(record.move_nodes) != count:
+        raise ValueError("A game record needs a time and a node count for every move")
+    # Cut long labels to 255 bytes on a character boundary so they still
+    # decode.
+    labels = [label.encode('utf-8')[:255].decode('utf-8', 'ignore').encode('utf-8')
+              for label in record.players]
+    try:
+        body = b''.join([
+            struct.pack(RECORD_FORMAT, record.timestamp,
+                        -1 if record.winner is None else record.winner),
+            _encode_varint(record.start),
+            _encode_varint(record.final[0]),
+            _encode_varint(record.final[1]),
+            _encode_varint(count),
+            bytes([len(labels[0])]), labels[0],
+            bytes([len(labels[1])]), labels[1],
+            struct.pack(f'<{count}B', *record.moves),
+            struct.pack(f'<{count}I', *[min(MAX_COUNTER, round(seconds * 1e6))
+                                        for seconds in record.move_times]),
+            struct.pack(f'<{count}I', *[min(MAX_COUNTER, nodes) for nodes in record.move_nodes]),
+        ])
+    except struct.error as exc:
+        raise ValueError(f"Game from {record.start} does not fit a game record: {exc}")
+    return struct.pack(LENGTH_FORMAT, len(body)) + body
+
+
+def decode_record(body):
+    timestamp, winner = struct.unpack_from(RECORD_FORMAT, body, 0)
+    start, offset = _decode_varint(body, RECORD_SIZE)
+    p1_final, offset = _decode_varint(body, offset)
+    p2_final, offset = _decode_varint(body, offset)
+    count, offset = _decode_varint(body, offset)
+    players = []
+    for _ in range(2):
+        length = body[offset]
+        players.append(body[offset + 1:offset + 1 + length].decode('utf-8'))
+        offset += 1 + length
+    moves = list(body[offset:offset + count])
+    offset += count
+    move_times = [micros / 1e6 for micros in struct.unpack_from(f'<{count}I', body, offset)]
+    offset += 4 * count
+    move_nodes = list(struct.unpack_from(f'<{count}I', body, offset))
+    return GameRecord(start, tuple(players), moves, move_times, move_nodes, (p1_final, p2_final),
+                      None if winner < 0 else winner, timestamp)
+
+
+def _check_header(header, path):
+    if len(header) != FILE_HEADER_SIZE or \
+            struct.unpack(FILE_HEADER_FORMAT, header) != (RECORDS_MAGIC, RECORDS_VERSION):
+        raise ValueError(f"Not a game record file: {path}")
+
+
+class GameRecordWriter:
+    def __init__(self, path=DEFAULT_RECORDS_PATH, buffer_size=DEFAULT_BUFFER_SIZE):
+        # Records are appended, so one file collects every session. The
+        # buffer means a finished game costs an encode and a memory copy; the
+        # disk only sees full buffers and the final flush. The GUI, play and
+        # tournament may append to the same file at once, so the buffer only
+        # ever holds whole records and goes out in one write on an O_APPEND
+        # descriptor, which the kernel never interleaves with another.
+        flags = os.O_WRONLY | os.O_APPEND | getattr(os, 'O_BINARY', 0)
+        try:
+            # The writer that creates the file writes the header, so two
+            # writers starting a new file do not both write one.
+            self._fd = os.open(path, flags | os.O_CREAT | os.O_EXCL, 0o644)
+            created = True
+        except FileExistsError:
+            self._fd = os.open(path, flags)
+            created = False
+        try:
+            if not created and os.fstat(self._fd).st_size > 0:
+                with open(path, 'rb') as f:
+                    _check_header(f.read(FILE_HEADER_SIZE), path)
+            else:
+                self._write(struct.pack(FILE_HEADER_FORMAT, RECORDS_MAGIC, RECORDS_VERSION))
+        except (OSError, ValueError):
+            os.close(self._fd)
+            raise
+        self.path = path
+        self.count = 0
+        self.buffer_size = buffer_size
+        self._buffer = bytearray()
+
+    def _write(self, data):
+        view = memoryview(data)
+        while view:
+            view = view[os.write(self._fd, view):]
+
+    def write(self, record):
+        self._buffer += encode_record(record)
+        self.count += 1
+        if len(self._buffer) >= self.buffer_size:
+            self.flush()
+
+    def flush(self):
+        if self._buffer:
+            self._write(self._buffer)
+            self._buffer = bytearray()
+
+    def close(self):
+        if self._fd is not None:
+            try:
+                self.flush()
+            finally:
+                os.close(self._fd)
+                self._fd = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+
+def read_records(path, buffer_size=1 << 20):
+    # A generator, so a file of any size is read one record at a time. A
+    # record cut short by a crash ends the stream instead of raising.
+    with open(path, 'rb', buffering=buffer_size) as f:
+        _check_header(f.read(FILE_HEADER_SIZE), path)
+        while True:
+            prefix = f.read(LENGTH_SIZE)
+            if len(prefix) < LENGTH_SIZE:
+                return
+            length, = struct.unpack(LENGTH_FORMAT, prefix)
+            body = f.read(length)
+            if len(body) < length:
+                return
+            yield decode_record(body)
+
+
+def check_game(record):
+    # One lattice solve gives the exact value of every position in a game,
+    # which is the same as re-searching each move to the end of the game.
+    # Yields (player, number of legal moves, margin lost, outcome changed)
+    # for every move.
+    solution = LatticeSolution(record.start)
+    values = solution.values
+    twos, threes = solution.twos, solution.threes
+    game = GameState(record.start)
+    for move in record.moves:
+        player = game.current_turn
+        move_values = {}
+        if twos > 0:
+            move_values[2] = -2 - values[twos - 1][threes]
+        if threes > 0:
+            move_values[3] = 3 - values[twos][threes - 1]
+        if move not in move_values or move not in game.legal_moves():
+            raise ValueError(f"Game from {record.start} has an illegal move: "
+                             f"{game.number} / {move}")
+
+        scores = (game.player1_score, game.player2_score)
+        margin = scores[player] - scores[1 - player]
+        best = max(move_values.values())
+        played = move_values[move]
+        outcome_changed = _sign(margin + played) < _sign(margin + best)
+        yield player, len(move_values), best - played, outcome_changed
+
+        game.play(move)
+        if move == 2:
+            twos -= 1
+        else:
+            threes -= 1
+
+
+def _sign(value):
+    return (value > 0) - (value < 0)
+
+
+class PlayerAnalysis:
+    def __init__(self):
+        self.games = 0
+        self.moves = 0
+        self.decisions = 0
+        self.mistakes = 0
+        self.blunders = 0
+        self.margin_lost = 0
+        self.move_time = 0.0
+        self.nodes = 0
+        self.latency = [0] * LATENCY_BUCKETS
+
+    def add_move(self, legal_count, margin_lost, outcome_changed, move_time, nodes):
+        self.moves += 1
+        self.move_time += move_time
+        self.nodes += nodes
+        micros = round(move_time * 1e6)
+        self.latency[min(LATENCY_BUCKETS - 1, micros.bit_length())] += 1
+        if legal_count > 1:
+            self.decisions += 1
+        if margin_lost > 0:
+            self.mistakes += 1
+            self.margin_lost += margin_lost
+        if outcome_changed:
+            self.blunders += 1
+
+    def merge(self, other):
+        for field in ('games', 'moves', 'decisions', 'mistakes', 'blunders', 'margin_lost',
+                      'move_time', 'nodes'):
+            setattr(self, field, getattr(self, field) + getattr(other, field))
+        self.latency = [mine + theirs for mine, theirs in zip(self.latency, other.latency)]
+
+    def latency_percentile(self, fraction):
+        # Upper edge of the bucket holding the percentile, in seconds.
+        target = fraction * self.moves
+        seen = 0
+        for bucket, count in enumerate(self.latency):
+            seen += count
+            if count and seen >= target:
+                return (1 << bucket) / 1e6
+        return 0.0
+
+    def rate(self, count):
+        return count / self.decisions if self.decisions else 0.0
+
+
+class RecordAnalysis:
+    def __init__(self):
+        self.games = 0
+        self.players = {}
+
+    def add(self, record):
+        self.games += 1
+        analyses = [self.players.setdefault(label, PlayerAnalysis()) for label in record.players]
+        for label in set(record.players):
+            self.players[label].games += 1
+        for (player, legal_count, margin_lost, outcome_changed), move_time, nodes in zip(
+                check_game(record), record.move_times, record.move_nodes):
+            analyses[player].add_move(legal_count, margin_lost, outcome_changed, move_time, nodes)
+
+    def merge(self, other):
+        self.games += other.games
+        for label, analysis in other.players.items():
+            self.players.setdefault(label, PlayerAnalysis()).merge(analysis)
+
+    def format(self):
+        lines = [f"{'player':<16} {'games':>8} {'moves':>9} {'decisions':>10} {'mistakes':>9} "
+                 f"{'blunders':>9} {'avg lost':>9} {'avg nodes':>10} {'p50':>10} {'p90':>10} "
+                 f"{'p99':>10}"]
+        for label, analysis in sorted(self.players.items()):
+            avg_lost = analysis.margin_lost / analysis.decisions if analysis.decisions else 0.0
+            avg_nodes = analysis.nodes / analysis.moves if analysis.moves else 0.0
+            lines.append(
+                f"{label:<16} {analysis.games:>8} {analysis.moves:>9} {analysis.decisions:>10} "
+                f"{analysis.rate(analysis.mistakes):>9.1%} {analysis.rate(analysis.blunders):>9.1%} "
+                f"{avg_lost:>9.3f} {avg_nodes:>10.1f} "
+                + ' '.join(f"{analysis.latency_percentile(fraction):>9.6f}s"
+                           for fraction in (0.5, 0.9, 0.99)))
+        return '\n'.join(lines)
+
+
+def _analyse_batch(records):
+    analysis = RecordAnalysis()
+    for record in records:
+        analysis.add(record)
+    return analysis
+
+
+def _batches(records, batch_size):
+    while True:
+        batch = list(itertools.islice(records, batch_size))
+        if not batch:
+            return
+        yield batch
+
+
+def analyse_records(paths, workers=None, limit=None, batch_size=DEFAULT_ANALYSIS_BATCH):
+    # Only a few batches per worker are in flight at once, so memory stays
+    # flat however many records the files hold.
+    records = itertools.chain.from_iterable(read_records(path) for path in paths)
+    if limit is not None:
+        records = itertools.islice(records, limit)
+    workers = workers or os.cpu_count() or 1
+    if workers == 1:
+        return _analyse_batch(records)
+
+    # records is imported with the package, and concurrent.futures.process
+    # pulls in multiprocessing, which only the analysis needs.
+    from concurrent.futures import ProcessPoolExecutor
+    analysis = RecordAnalysis()
+    pending = deque()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for batch in _batches(records, batch_size):
+            pending.append(executor.submit(_analyse_batch, batch))
+            if len(pending) >= 2 * workers:
+                analysis.merge(pending.popleft().result())
+        while pending:
+            analysis.merge(pending.popleft().result())
+    return analysis
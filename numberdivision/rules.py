@@ -0,0 +1,86 @@
+MIN_START_NUMBER = 20000
+MAX_START_NUMBER = 30000
+END_NUMBER = 10
+MOVES = (2, 3)
+
+
+def legal_moves(number):
+    if number <= END_NUMBER:
+        return []
+    return [move for move in MOVES if number % move == 0]
+
+
+def is_game_over(number):
+    return not legal_moves(number)
+
+
+def apply_move(number, player1_score, player2_score, game_bank, current_turn, divisor):
+    new_number = number // divisor
+
+    if divisor == 2:
+        if current_turn == 0:
+            player2_score += 2
+        else:
+            player1_score += 2
+    elif divisor == 3:
+        if current_turn == 0:
+            player1_score += 3
+        else:
+            player2_score += 3
+
+    if new_number % 10 == 0 or new_number % 5 == 0:
+        game_bank += 1
+
+    return new_number, player1_score, player2_score, game_bank
+
+
+def settle_bank(player1_score, player2_score, game_bank, current_turn):
+    last_player_turn = 1 - current_turn
+    if game_bank > 0:
+        if last_player_turn == 0:
+            player1_score += game_bank
+        else:
+            player2_score += game_bank
+    return player1_score, player2_score
+
+
+def start_numbers():
+    first = MIN_START_NUMBER + (-MIN_START_NUMBER) % 6
+    return range(first, MAX_START_NUMBER + 1, 6)
+
+
+class GameState:
+    def __init__(self, number, player1_score=0, player2_score=0, game_bank=0, current_turn=0):
+        self.number = number
+        self.player1_score = player1_score
+        self.player2_score = player2_score
+        self.game_bank = game_bank
+        self.current_turn = current_turn
+        self.moves = []
+
+    def legal_moves(self):
+        return legal_moves(self.number)
+
+    def is_over(self):
+        return is_game_over(self.number)
+
+    def play(self, divisor):
+        if divisor not in self.legal_moves():
+            raise ValueError(f"Cannot divide {self.number} by {divisor}")
+        self.number, self.player1_score, self.player2_score, self.game_bank = apply_move(
+            self.number, self.player1_score, self.player2_score, self.game_bank,
+            self.current_turn, divisor)
+        self.current_turn = 1 - self.current_turn
+        self.moves.append(divisor)
+
+    def final_scores(self):
+        return settle_bank(self.player1_score, self.player2_score,
+                           self.game_bank, self.current_turn)
+
+    def winner(self):
+        p1_final, p2_final = self.final_scores()
+        if p1_final > p2_final:
+            return 0
+        if p2_final > p1_final:
+            return 1
+        return None
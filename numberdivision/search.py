@@ -0,0 +1,368 @@
+import math
+import sys
+import time
+from importlib.util import find_spec
+
+from .engines import get_engine, register
+from .evaluation import heuristic_evaluation
+from .lattice_solver import factor_number, get_lattice_move
+from .rules import apply_move
+from .stats import SearchStats
+from .transposition import TT_EXACT, TT_LOWER, TT_UPPER, TranspositionTable, position_key
+
+
+_profiler = None
+
+
+class SearchTimeout(Exception):
+    pass
+
+
+class SearchControl:
+    def __init__(self, deadline=None):
+        self.deadline = deadline
+        self.stopped = False
+        self.armed = False
+        self.pv_moves = {}
+        self.history = {}
+        self.horizon_reached = False
+        self.completed_depth = 0
+
+    def stop(self):
+        self.stopped = True
+
+    def limit_reached(self):
+        return self.stopped or (
+            self.deadline is not None and time.perf_counter() >= self.deadline)
+
+    def check_limits(self):
+        if self.armed and self.limit_reached():
+            raise SearchTimeout()
+
+    def order_children(self, node, human_is_player1):
+        if len(node.children) < 2:
+            return
+        pv_move = self.pv_moves.get(position_key(node, human_is_player1))
+        history = self.history
+        is_maximizing = node.is_maximizing
+        node.children.sort(key=lambda child: (
+            child[0] != pv_move,
+            -history.get((is_maximizing, child[0]), 0)))
+
+    def record_best_move(self, node, human_is_player1, move, remaining_depth):
+        self.pv_moves[position_key(node, human_is_player1)] = move
+        history_key = (node.is_maximizing, move)
+        self.history[history_key] = self.history.get(
+            history_key, 0) + (1 << remaining_depth)
+
+
+class GameNode:
+    def __init__(self, number, player1_score, player2_score, game_bank, depth, is_maximizing):
+        self.number = number
+        self.player1_score = player1_score
+        self.player2_score = player2_score
+        self.game_bank = game_bank
+        self.depth = depth
+        self.is_maximizing = is_maximizing
+        self.children = []
+        self.best_move = None
+
+    def generate_children(self, current_player_turn, human_is_player1):
+        self.children = []
+        ai_is_player1 = not human_is_player1
+        ai_turn = (current_player_turn == 0 and ai_is_player1) or \
+                  (current_player_turn == 1 and not ai_is_player1)
+
+        for move in [2, 3]:
+            if self.number % move == 0:
+                new_number, new_p1_score, new_p2_score, new_bank = apply_move(
+                    self.number, self.player1_score, self.player2_score,
+                    self.game_bank, current_player_turn, move)
+
+                child_node = GameNode(
+                    new_number,
+                    new_p1_score,
+                    new_p2_score,
+                    new_bank,
+                    self.depth + 1,
+                    not self.is_maximizing
+                )
+                self.children.append((move, child_node))
+
+
+def minimax(node, depth, alpha, beta, use_alpha_beta, human_is_player1, max_depth=5, tt=None, control=None,
+            stats=None):
+    if stats is not None:
+        stats.enter_node(node, depth)
+    current_player_turn = (node.depth % 2 == 0) if human_is_player1 else (
+        node.depth % 2 != 0)
+
+    if control is not None:
+        control.check_limits()
+
+    if node.number <= 10 or depth >= max_depth:
+        if control is not None and node.number > 10:
+            control.horizon_reached = True
+        value = heuristic_evaluation(node, human_is_player1)
+        if stats is not None:
+            stats.record_leaf(node.number <= 10)
+            stats.exit_node(node, depth, value)
+        return value
+
+    tt_key = None
+    if tt is not None:
+        tt_key = TranspositionTable.make_key(
+            node, human_is_player1, max_depth - depth)
+        entry = tt.probe(tt_key)
+        if entry is not None:
+            value, flag, move = entry
+            if flag == TT_EXACT or \
+                    (flag == TT_LOWER and value >= beta) or \
+                    (flag == TT_UPPER and value <= alpha):
+                if depth == 0:
+                    node.best_move = move
+                if control is not None:
+                    control.horizon_reached = True
+                if stats is not None:
+                    stats.exit_node(node, depth, value)
+                return value
+    alpha_orig = alpha
+    beta_orig = beta
+
+    ai_turn = node.is_maximizing
+    actual_turn = -1
+    if human_is_player1:
+        actual_turn = 1 if ai_turn else 0
+    else:
+        actual_turn = 0 if ai_turn else 1
+
+    node.generate_children(actual_turn, human_is_player1)
+
+    if not node.children:
+        value = -math.inf if node.is_maximizing else math.inf
+        if stats is not None:
+            stats.record_terminal()
+            stats.exit_node(node, depth, value)
+        return value
+
+    if control is not None:
+        control.order_children(node, human_is_player1)
+
+    if node.is_maximizing:
+        best_score = -math.inf
+        best_move_for_node = node.children[0][0] if node.children else None
+        for move, child in node.children:
+            score = minimax(child, depth + 1, alpha, beta,
+                            use_alpha_beta, human_is_player1, max_depth, tt, control, stats)
+            if score > best_score:
+                best_score = score
+                best_move_for_node = move
+            if use_alpha_beta:
+                alpha = max(alpha, best_score)
+                if beta <= alpha:
+                    if stats is not None:
+                        stats.record_cutoff(depth, alpha, beta)
+                    break
+        if depth == 0:
+            node.best_move = best_move_for_node
+        if control is not None:
+            control.record_best_move(
+                node, human_is_player1, best_move_for_node, max_depth - depth)
+        if tt is not None:
+            _store_tt_entry(tt, tt_key, best_score, alpha_orig, beta_orig,
+                            use_alpha_beta, best_move_for_node)
+        if stats is not None:
+            stats.exit_node(node, depth, best_score)
+        return best_score
+    else:
+        best_score = math.inf
+        best_move_for_node = node.children[0][0] if node.children else None
+        for move, child in node.children:
+            score = minimax(child, depth + 1, alpha, beta,
+                            use_alpha_beta, human_is_player1, max_depth, tt, control, stats)
+            if score < best_score:
+                best_score = score
+                best_move_for_node = move  
+            if use_alpha_beta:
+                beta = min(beta, best_score)
+                if beta <= alpha:
+                    if stats is not None:
+                        stats.record_cutoff(depth, alpha, beta)
+                    break
+        if control is not None:
+            control.record_best_move(
+                node, human_is_player1, best_move_for_node, max_depth - depth)
+        if tt is not None:
+            _store_tt_entry(tt, tt_key, best_score, alpha_orig, beta_orig,
+                            use_alpha_beta, best_move_for_node)
+        if stats is not None:
+            stats.exit_node(node, depth, best_score)
+        return best_score
+
+
+def _store_tt_entry(tt, key, value, alpha, beta, use_alpha_beta, best_move):
+    if not use_alpha_beta:
+        flag = TT_EXACT
+    elif value <= alpha:
+        flag = TT_UPPER
+    elif value >= beta:
+        flag = TT_LOWER
+    else:
+        flag = TT_EXACT
+    tt.store(key, value, flag, best_move)
+
+
+def set_profiler(profiler):
+    global _profiler
+    _profiler = profiler
+
+
+def get_profiler():
+    return _profiler
+
+
+def get_computer_move(current_number, p1_score, p2_score, bank, algorithm, human_is_player1, max_depth=4, tt=None,
+                      tablebase=None, time_budget_ms=None, control=None, stats=None, book=None):
+    # With profiling off this is the only cost. The profiler calls back in
+    # with its tracer installed, which skips this branch.
+    if _profiler is not None and sys.getprofile() is None:
+        return _profiler.profile_move(get_computer_move, current_number, p1_score, p2_score, bank,
+                                      algorithm, human_is_player1, max_depth, tt, tablebase,
+                                      time_budget_ms, control, stats, book)
+    if max_depth is None:
+        # No depth limit: a time-budgeted search deepens until the budget
+        # runs out or it reaches the end of the game.
+        max_depth = max_game_length(current_number)
+    if stats is None:
+        stats = SearchStats()
+    nodes_before = stats.nodes
+    stats.searches += 1
+
+    start_time = time.time()
+    best_move = None
+    if tablebase is not None:
+        best_move = tablebase.best_move(current_number, bank)
+    if best_move is None and book is not None and get_engine(algorithm).book:
+        best_move = book.best_move(current_number, p1_score, p2_score, bank, human_is_player1)
+
+    if best_move is None:
+        best_move = get_engine(algorithm).search(current_number, p1_score, p2_score, bank, human_is_player1,
+                                                 max_depth, tt, time_budget_ms, control, stats)
+
+    move_time = time.time() - start_time
+    stats.elapsed += move_time
+    return best_move, move_time, stats.nodes - nodes_before
+
+
+@register('minimax', 'Minimax')
+def search_minimax(current_number, p1_score, p2_score, bank, human_is_player1, max_depth,
+                   tt=None, time_budget_ms=None, control=None, stats=None):
+    return _search_game_tree(current_number, p1_score, p2_score, bank, False, human_is_player1,
+                             max_depth, tt, time_budget_ms, control, stats)
+
+
+@register('alpha-beta', 'Alpha-Beta')
+def search_alpha_beta(current_number, p1_score, p2_score, bank, human_is_player1, max_depth,
+                      tt=None, time_budget_ms=None, control=None, stats=None):
+    return _search_game_tree(current_number, p1_score, p2_score, bank, True, human_is_player1,
+                             max_depth, tt, time_budget_ms, control, stats)
+
+
+@register('lattice', 'Exact', ponder=False, book=False)
+def search_lattice(current_number, p1_score, p2_score, bank, human_is_player1, max_depth,
+                   tt=None, time_budget_ms=None, control=None, stats=None):
+    best_move, _, cells = get_lattice_move(current_number, bank)
+    if stats is not None:
+        stats.nodes += cells
+    return best_move
+
+
+@register('parallel', 'Parallel', ponder=False)
+def search_parallel(current_number, p1_score, p2_score, bank, human_is_player1, max_depth,
+                    tt=None, time_budget_ms=None, control=None, stats=None):
+    from .parallel import parallel_search
+    best_move = parallel_search(current_number, p1_score, p2_score, bank, human_is_player1,
+                                max_depth, time_budget_ms=time_budget_ms, control=control,
+                                stats=stats)
+    if best_move is None:
+        best_move = _root_move(GameNode(current_number, p1_score, p2_score, bank, 0, True),
+                               current_number)
+    return best_move
+
+
+if find_spec('numpy') is not None:
+    @register('numpy', 'NumPy', ponder=False)
+    def search_numpy(current_number, p1_score, p2_score, bank, human_is_player1, max_depth,
+                     tt=None, time_budget_ms=None, control=None, stats=None):
+        from .frontier import frontier_search
+        return frontier_search(current_number, p1_score, p2_score, bank, human_is_player1, max_depth,
+                               time_budget_ms, control, stats)
+
+
+def _search_game_tree(current_number, p1_score, p2_score, bank, use_alpha_beta, human_is_player1,
+                      max_depth, tt, time_budget_ms, control, stats):
+    if time_budget_ms is not None or control is not None:
+        return _iterative_deepening(current_number, p1_score, p2_score, bank, use_alpha_beta,
+                                    human_is_player1, time_budget_ms, max_depth, tt, control, stats)
+    root = GameNode(current_number, p1_score, p2_score, bank, 0, True)
+    minimax(root, 0, -math.inf, math.inf,
+            use_alpha_beta, human_is_player1, max_depth, tt, None, stats)
+    return _root_move(root, current_number)
+
+
+def _iterative_deepening(current_number, p1_score, p2_score, bank, use_alpha_beta, human_is_player1,
+                         time_budget_ms=None, max_depth=None, tt=None, control=None, stats=None):
+    if control is None:
+        control = SearchControl()
+    if stats is None:
+        stats = SearchStats()
+    if time_budget_ms is not None:
+        control.deadline = time.perf_counter() + time_budget_ms / 1000
+    longest_game = max_game_length(current_number)
+    if max_depth is None or max_depth > longest_game:
+        max_depth = longest_game
+    best_move = None
+    depth = 1
+    while depth <= max_depth:
+        control.horizon_reached = False
+        root = GameNode(current_number, p1_score, p2_score, bank, 0, True)
+        iteration_start = time.perf_counter()
+        iteration_nodes = stats.nodes
+        try:
+            minimax(root, 0, -math.inf, math.inf,
+                    use_alpha_beta, human_is_player1, depth, tt, control, stats)
+        except SearchTimeout:
+            break
+        stats.record_iteration(depth, time.perf_counter() - iteration_start,
+                               stats.nodes - iteration_nodes)
+        best_move = _root_move(root, current_number)
+        control.completed_depth = depth
+        control.armed = True
+        if not control.horizon_reached or control.limit_reached():
+            break
+        depth += 1
+    return best_move
+
+
+def max_game_length(number):
+    twos, threes, _ = factor_number(number)
+    return twos + threes
+
+
+def _root_move(root, current_number):
+    if root.best_move is not None and not root.children:
+        return root.best_move
+
+    if root.best_move is None and root.children:
+        root.best_move = root.children[0][0]
+    elif not root.children and current_number > 10:
+        if current_number % 2 == 0:
+            root.best_move = 2
+        elif current_number % 3 == 0:
+            root.best_move = 3
+        else:
+            return None
+    elif not root.children:
+        return None
+
+    return root.best_move
@@ -0,0 +1,198 @@
+from array import array
+
+from .negamax import SCALE
+from .rules import legal_moves
+from .stats import SearchStats
+
+NO_NODE = -1
+DEFAULT_MAX_NODES = 2_000_000
+
+MAXIMIZING = 1
+CUTOFF = 2
+HAS_VALUE = 4
+
+
+class CapturedTree:
+    # One search tree in parallel arrays, so hundreds of thousands of nodes
+    # cost a few dozen bytes each. Nodes are numbered in the order the search
+    # entered them; children are linked through first_child/next_sibling.
+    # Values and windows are stored from the AI's point of view.
+    def __init__(self):
+        self.numbers = []
+        self.first = array('q')
+        self.second = array('q')
+        self.bank = array('l')
+        self.depth = array('H')
+        self.parent = array('l')
+        self.first_child = array('l')
+        self.last_child = array('l')
+        self.next_sibling = array('l')
+        self.value = array('d')
+        self.alpha = array('d')
+        self.beta = array('d')
+        self.flags = bytearray()
+        # 'game' nodes carry both players' scores (minimax), 'diff' nodes the
+        # AI's score minus the human's (negamax).
+        self.kind = None
+        self.complete = False
+        self.truncated = False
+
+    def __len__(self):
+        return len(self.numbers)
+
+    def add(self, node, depth, parent):
+        index = len(self.numbers)
+        self.numbers.append(node.number)
+        if hasattr(node, 'player1_score'):
+            self.kind = 'game'
+            self.first.append(node.player1_score)
+            self.second.append(node.player2_score)
+            self.bank.append(node.game_bank)
+        else:
+            self.kind = 'diff'
+            self.first.append(node.score_diff)
+            self.second.append(0)
+            self.bank.append(node.bank)
+        self.depth.append(depth)
+        self.parent.append(parent)
+        self.first_child.append(NO_NODE)
+        self.last_child.append(NO_NODE)
+        self.next_sibling.append(NO_NODE)
+        self.value.append(0.0)
+        self.alpha.append(0.0)
+        self.beta.append(0.0)
+        self.flags.append(MAXIMIZING if node.is_maximizing else 0)
+        if parent != NO_NODE:
+            if self.first_child[parent] == NO_NODE:
+                self.first_child[parent] = index
+            else:
+                self.next_sibling[self.last_child[parent]] = index
+            self.last_child[parent] = index
+        return index
+
+    def _from_search(self, index, value):
+        # Negamax scores are scaled integers for the side to move.
+        if self.kind == 'diff':
+            value /= SCALE
+            if not self.flags[index] & MAXIMIZING:
+                value = -value
+        return value
+
+    def set_value(self, index, value):
+        self.value[index] = self._from_search(index, value)
+        self.flags[index] |= HAS_VALUE
+
+    def set_cutoff(self, index, alpha, beta):
+        alpha = self._from_search(index, alpha)
+        beta = self._from_search(index, beta)
+        self.alpha[index], self.beta[index] = min(alpha, beta), max(alpha, beta)
+        self.flags[index] |= CUTOFF
+
+    def children(self, index):
+        child = self.first_child[index]
+        while child != NO_NODE:
+            yield child
+            child = self.next_sibling[child]
+
+    def has_children(self, index):
+        return self.first_child[index] != NO_NODE
+
+    def move(self, index):
+        parent = self.parent[index]
+        return None if parent == NO_NODE else self.numbers[parent] // self.numbers[index]
+
+    def pruned_moves(self, index):
+        # Moves a cutoff kept the search from trying.
+        if not self.flags[index] & CUTOFF:
+            return []
+        searched = {self.move(child) for child in self.children(index)}
+        return [move for move in legal_moves(self.numbers[index]) if move not in searched]
+
+    def best_child(self, index):
+        best = None
+        maximizing = self.flags[index] & MAXIMIZING
+        for child in self.children(index):
+            if not self.flags[child] & HAS_VALUE:
+                continue
+            if best is None or (self.value[child] > self.value[best] if maximizing
+                                else self.value[child] < self.value[best]):
+                best = child
+        return best
+
+    def describe(self, index):
+        move = self.move(index)
+        parts = [f"/{move} -> {self.numbers[index]}" if move else f"{self.numbers[index]}"]
+        if self.kind == 'game':
+            parts.append(f"P1 {self.first[index]} P2 {self.second[index]}")
+        else:
+            parts.append(f"diff {self.first[index]:+d}")
+        parts.append(f"bank {self.bank[index]}")
+        parts.append("max" if self.flags[index] & MAXIMIZING else "min")
+        if self.flags[index] & HAS_VALUE:
+            parts.append(f"value {self.value[index]:+.3f}")
+        else:
+            parts.append("value ?")
+        if self.flags[index] & CUTOFF:
+            parts.append(f"cutoff [{self.alpha[index]:+.3f}, {self.beta[index]:+.3f}]")
+            pruned = self.pruned_moves(index)
+            if pruned:
+                parts.append("pruned " + ' '.join(f"/{move}" for move in pruned))
+        return '  '.join(parts)
+
+
+class SearchTree:
+    # Records the tree of the last search through SearchStats hooks. The
+    # engines call the hooks only on a SearchStats built by stats(), so a
+    # search without a SearchTree records nothing.
+    def __init__(self, max_nodes=DEFAULT_MAX_NODES):
+        self.max_nodes = max_nodes
+        self.current = CapturedTree()
+        self.last = None
+        self.path = []
+
+    def stats(self):
+        # A fresh SearchStats per search; the previous tree is dropped.
+        self.current = CapturedTree()
+        self.last = None
+        self.path = []
+        return SearchStats(on_node=self.enter_node, on_exit=self.exit_node,
+                           on_cutoff=self.record_cutoff)
+
+    def tree(self):
+        # The last search that ran to completion, or the one in progress.
+        return self.last if self.last is not None else self.current
+
+    def enter_node(self, node, depth):
+        if depth == 0:
+            # Each root starts a new tree: iterative deepening and MTD(f)
+            # leave the last pass they finished.
+            self.current = CapturedTree()
+            self.path = []
+        # Engines that do not report every exit (the parallel split, a search
+        # cut short by a timeout) are handled by trusting the depth.
+        del self.path[depth:]
+        tree = self.current
+        parent = self.path[-1] if self.path else NO_NODE
+        if len(self.path) != depth or (depth > 0 and parent == NO_NODE) or \
+                len(tree) >= self.max_nodes:
+            tree.truncated = tree.truncated or len(tree) >= self.max_nodes
+            self.path.append(NO_NODE)
+            return
+        self.path.append(tree.add(node, depth, parent))
+
+    def _index(self, depth):
+        return self.path[depth] if depth < len(self.path) else NO_NODE
+
+    def exit_node(self, node, depth, value):
+        index = self._index(depth)
+        if index == NO_NODE:
+            return
+        self.current.set_value(index, value)
+        if depth == 0:
+            self.current.complete = True
+            self.last = self.current
+
+    def record_cutoff(self, depth, alpha, beta):
+        index = self._index(depth)
+        if index != NO_NODE:
+            self.current.set_cutoff(index, alpha, beta)
@@ -0,0 +1,353 @@
+import asyncio
+import itertools
+import json
+import multiprocessing
+import os
+import random
+import signal
+import sys
+import time
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+
+from .engines import get_engine
+from .rules import GameState, start_numbers
+from .search import get_computer_move
+from .worker import ponder_key
+
+DEFAULT_HOST = '127.0.0.1'
+DEFAULT_PORT = 8765
+DEFAULT_CACHE_SIZE = 1 << 16
+MAX_DEPTH = 40
+
+
+def _ready():
+    return os.getpid()
+
+
+def _search_move(number, p1_score, p2_score, bank, algorithm, human_is_player1, depth):
+    move, _, nodes = get_computer_move(number, p1_score, p2_score, bank, algorithm,
+                                       human_is_player1, depth)
+    return move, nodes
+
+
+class SearchCache:
+    def __init__(self, executor, max_entries=DEFAULT_CACHE_SIZE):
+        self.executor = executor
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+        self.in_flight = {}
+        self.hits = 0
+        self.misses = 0
+        self.joined = 0
+        self.nodes = 0
+
+    async def best_move(self, game, algorithm, depth, human_is_player1):
+        # A search result only depends on the number, the score difference
+        # and the bank, so every session that reaches a position shares it.
+        # Identical searches that are still running are awaited, not repeated.
+        key = (algorithm, depth) + ponder_key(game.number, game.player1_score, game.player2_score,
+                                              game.game_bank, human_is_player1)
+        if key in self.entries:
+            self.hits += 1
+            self.entries.move_to_end(key)
+            return self.entries[key]
+
+        future = self.in_flight.get(key)
+        if future is not None:
+            self.joined += 1
+        else:
+            self.misses += 1
+            future = asyncio.get_running_loop().run_in_executor(
+                self.executor, _search_move, game.number, game.player1_score, game.player2_score,
+                game.game_bank, algorithm, human_is_player1, depth)
+            self.in_flight[key] = future
+            future.add_done_callback(lambda done: self._finish(key, done))
+        move, _ = await asyncio.shield(future)
+        return move
+
+    def _finish(self, key, future):
+        del self.in_flight[key]
+        if future.cancelled() or future.exception() is not None:
+            return
+        move, nodes = future.result()
+        self.nodes += nodes
+        self.entries[key] = move
+        if len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def to_dict(self):
+        return {
+            'entries': len(self.entries),
+            'hits': self.hits,
+            'misses': self.misses,
+            'joined': self.joined,
+            'in_flight': len(self.in_flight),
+            'nodes': self.nodes,
+        }
+
+
+class GameSession:
+    def __init__(self, game_id, number, algorithm, depth, computer_first):
+        self.game_id = game_id
+        self.game = GameState(number)
+        self.algorithm = algorithm
+        self.depth = depth
+        self.human_player = 1 if computer_first else 0
+
+    @property
+    def human_is_player1(self):
+        return self.human_player == 0
+
+    def is_computer_turn(self):
+        return not self.game.is_over() and self.game.current_turn != self.human_player
+
+    def to_dict(self):
+        game = self.game
+        state = {
+            'game': self.game_id,
+            'number': game.number,
+            'scores': [game.player1_score, game.player2_score],
+            'bank': game.game_bank,
+            'turn': game.current_turn,
+            'human_player': self.human_player,
+            'moves': list(game.moves),
+            'legal_moves': game.legal_moves(),
+            'over': game.is_over(),
+        }
+        if state['over']:
+            state['final'] = list(game.final_scores())
+            state['winner'] = game.winner()
+        return state
+
+
+class GameServer:
+    def __init__(self, workers=None, cache_size=DEFAULT_CACHE_SIZE):
+        self.workers = workers or os.cpu_count() or 1
+        self.executor = ProcessPoolExecutor(max_workers=self.workers,
+                                            mp_context=multiprocessing.get_context('spawn'))
+        self.cache = SearchCache(self.executor, cache_size)
+        self.sessions = {}
+        self.game_ids = itertools.count(1)
+        self.server = None
+        self.clients = {}
+
+    async def start(self, host=DEFAULT_HOST, port=DEFAULT_PORT, path=None):
+        if path is not None:
+            self.server = await asyncio.start_unix_server(self.handle_client, path)
+        else:
+            self.server = await asyncio.start_server(self.handle_client, host, port)
+        return self.server
+
+    async def warm_up(self):
+        # Spawned workers take a while to import the engine, which would
+        # otherwise land on the first moves.
+        loop = asyncio.get_running_loop()
+        await asyncio.gather(*[loop.run_in_executor(self.executor, _ready)
+                               for _ in range(self.workers)])
+
+    def address(self):
+        return self.server.sockets[0].getsockname()
+
+    async def close(self):
+        if self.server is not None:
+            self.server.close()
+            await self.server.wait_closed()
+        for writer in list(self.clients.values()):
+            writer.close()
+        await asyncio.gather(*self.clients, return_exceptions=True)
+        self.executor.shutdown(wait=True, cancel_futures=True)
+
+    async def handle_client(self, reader, writer):
+        owned = set()
+        self.clients[asyncio.current_task()] = writer
+        try:
+            while True:
+                line = await reader.readline()
+                if not line:
+                    break
+                try:
+                    response = await self.handle_request(json.loads(line), owned)
+                except (ValueError, TypeError) as exc:
+                    response = {'ok': False, 'error': str(exc)}
+                except ConnectionError:
+                    raise
+                except Exception as exc:
+                    # A search that raises in a worker process ends the
+                    # request, not the session.
+                    request_text = line.decode(errors='replace').strip()[:200]
+                    print(f"Request {request_text} failed: {exc!r}", file=sys.stderr, flush=True)
+                    response = {'ok': False, 'error': f"Internal error: {exc!r}"}
+                writer.write((json.dumps(response) + '\n').encode())
+                await writer.drain()
+        except ConnectionError:
+            pass
+        finally:
+            for game_id in owned:
+                self.sessions.pop(game_id, None)
+            del self.clients[asyncio.current_task()]
+            writer.close()
+
+    async def handle_request(self, request, owned):
+        if not isinstance(request, dict):
+            raise ValueError("Requests must be JSON objects")
+        command = request.get('cmd')
+        if command == 'start':
+            return await self.start_game(request, owned)
+        if command == 'move':
+            return await self.play_move(self._session(request, owned), request.get('divisor'))
+        if command == 'state':
+            return {'ok': True, 'state': self._session(request, owned).to_dict()}
+        if command == 'close':
+            session = self._session(request, owned)
+            del self.sessions[session.game_id]
+            owned.discard(session.game_id)
+            return {'ok': True}
+        if command == 'stats':
+            return {'ok': True, 'sessions': len(self.sessions), 'cache': self.cache.to_dict()}
+        raise ValueError(f"Unknown command: {command}")
+
+    def _session(self, request, owned):
+        # Games belong to the connection that started them.
+        session = self.sessions.get(request.get('game'))
+        if session is None or session.game_id not in owned:
+            raise ValueError(f"Unknown game: {request.get('game')}")
+        return session
+
+    async def start_game(self, request, owned):
+        algorithm = request.get('algorithm', 'alpha-beta')
+        get_engine(algorithm)
+        number = request.get('number')
+        number = random.choice(start_numbers()) if number is None else int(number)
+        if number <= 10:
+            raise ValueError("The number must be greater than 10")
+        depth = int(request.get('depth', 4))
+        if not 1 <= depth <= MAX_DEPTH:
+            raise ValueError(f"The depth must be between 1 and {MAX_DEPTH}")
+        session = GameSession(next(self.game_ids), number, algorithm, depth,
+                              bool(request.get('computer_first')))
+        self.sessions[session.game_id] = session
+        owned.add(session.game_id)
+        response = {'ok': True}
+        if session.is_computer_turn():
+            response['computer_move'] = await self.computer_move(session)
+        response['state'] = session.to_dict()
+        return response
+
+    async def play_move(self, session, divisor):
+        if session.is_computer_turn() or session.game.is_over():
+            raise ValueError("It is not your turn")
+        session.game.play(int(divisor))
+        response = {'ok': True}
+        if session.is_computer_turn():
+            response['computer_move'] = await self.computer_move(session)
+        response['state'] = session.to_dict()
+        return response
+
+    async def computer_move(self, session):
+        game = session.game
+        move = await self.cache.best_move(game, session.algorithm, session.depth,
+                                          session.human_is_player1)
+        if move is None:
+            move = game.legal_moves()[0]
+        game.play(move)
+        return move
+
+
+async def serve(host=DEFAULT_HOST, port=DEFAULT_PORT, path=None, workers=None,
+                cache_size=DEFAULT_CACHE_SIZE):
+    server = GameServer(workers, cache_size)
+    await server.warm_up()
+    await server.start(host, port, path)
+    print(f"Listening on {path or '%s:%d' % server.address()[:2]}", flush=True)
+    serving = asyncio.ensure_future(server.server.serve_forever())
+    asyncio.get_running_loop().add_signal_handler(signal.SIGTERM, serving.cancel)
+    try:
+        await serving
+    except asyncio.CancelledError:
+        pass
+    finally:
+        await server.close()
+
+
+def _percentile(sorted_values, fraction):
+    index = min(len(sorted_values) - 1, int(fraction * len(sorted_values)))
+    return sorted_values[index]
+
+
+async def _request(reader, writer, request):
+    writer.write((json.dumps(request) + '\n').encode())
+    await writer.drain()
+    response = json.loads(await reader.readline())
+    if not response['ok']:
+        raise RuntimeError(response['error'])
+    return response
+
+
+async def _run_client(connect, remaining, rng, algorithm, depth, latencies):
+    reader, writer = await connect()
+    games = 0
+    try:
+        while remaining[0] > 0:
+            remaining[0] -= 1
+            response = await _request(reader, writer, {
+                'cmd': 'start', 'number': rng.choice(start_numbers()), 'algorithm': algorithm,
+                'depth': depth, 'computer_first': rng.random() < 0.5})
+            state = response['state']
+            while not state['over']:
+                start_time = time.perf_counter()
+                response = await _request(reader, writer, {
+                    'cmd': 'move', 'game': state['game'], 'divisor': rng.choice(state['legal_moves'])})
+                latencies.append(time.perf_counter() - start_time)
+                state = response['state']
+            await _request(reader, writer, {'cmd': 'close', 'game': state['game']})
+            games += 1
+    finally:
+        writer.close()
+        await writer.wait_closed()
+    return games
+
+
+async def run_loadgen(sessions=16, games=200, host=None, port=DEFAULT_PORT, path=None,
+                      algorithm='alpha-beta', depth=4, seed=None, workers=None):
+    # Without an address, start a server in this process on a free port.
+    server = None
+    if host is None and path is None:
+        server = GameServer(workers)
+        await server.warm_up()
+        await server.start(DEFAULT_HOST, 0)
+        host, port = server.address()[:2]
+
+    async def connect():
+        if path is not None:
+            return await asyncio.open_unix_connection(path)
+        return await asyncio.open_connection(host, port)
+
+    rng = random.Random(seed)
+    remaining = [games]
+    latencies = []
+    try:
+        start_time = time.perf_counter()
+        played = await asyncio.gather(*[
+            _run_client(connect, remaining, random.Random(rng.random()), algorithm, depth, latencies)
+            for _ in range(sessions)])
+        elapsed = time.perf_counter() - start_time
+        reader, writer = await connect()
+        server_stats = await _request(reader, writer, {'cmd': 'stats'})
+        writer.close()
+        await writer.wait_closed()
+    finally:
+        if server is not None:
+            await server.close()
+
+    latencies.sort()
+    return {
+        'sessions': sessions,
+        'games': sum(played),
+        'moves': len(latencies),
+        'seconds': elapsed,
+        'moves_per_sec': len(latencies) / elapsed if elapsed > 0 else None,
+        'latency_p50': _percentile(latencies, 0.5) if latencies else None,
+        'latency_p99': _percentile(latencies, 0.99) if latencies else None,
+        'cache': server_stats['cache'],
+    }
@@ -0,0 +1,98 @@
+import random
+from collections import namedtuple
+
+from .lattice_solver import LatticeSolution
+from .rules import END_NUMBER, start_numbers
+
+DIFFICULTIES = ('easy', 'medium', 'hard')
+WINNERS = {'first': 0, 'second': 1, 'draw': None}
+# Critical positions at which a number counts as medium and as hard. Every
+# multiple of 6 has at least one.
+DIFFICULTY_THRESHOLDS = (2, 4)
+
+# value is the margin the first player can force, winner 0 or 1 for the
+# player who wins with best play (None for a draw), length the plies of the
+# solved game. positions counts the positions with a move to make, choices
+# those with two moves, and critical those where the two moves are not
+# equally good.
+StartInfo = namedtuple('StartInfo', ['number', 'twos', 'threes', 'value', 'winner', 'length',
+                                     'positions', 'choices', 'critical', 'difficulty'])
+
+_index = None
+
+
+def _annotate(number):
+    solution = LatticeSolution(number)
+    positions = 0
+    choices = 0
+    critical = 0
+    power_of_two = 1
+    for i in range(solution.twos + 1):
+        power_of_three = 1
+        for j in range(solution.threes + 1):
+            if (i or j) and solution.rest * power_of_two * power_of_three > END_NUMBER:
+                positions += 1
+                if i and j:
+                    choices += 1
+                    if -2 - solution.values[i - 1][j] != 3 - solution.values[i][j - 1]:
+                        critical += 1
+            power_of_three *= 3
+        power_of_two *= 2
+
+    value = solution.value()
+    winner = 0 if value > 0 else 1 if value < 0 else None
+    return (number, solution.twos, solution.threes, value, winner,
+            len(solution.principal_variation()), positions, choices, critical)
+
+
+class StartIndex:
+    def __init__(self, numbers=None):
+        if numbers is None:
+            numbers = start_numbers()
+        self.entries = []
+        for number in numbers:
+            entry = _annotate(number)
+            level = sum(entry[-1] >= threshold for threshold in DIFFICULTY_THRESHOLDS)
+            self.entries.append(StartInfo(*entry, DIFFICULTIES[level]))
+        self.by_number = {info.number: info for info in self.entries}
+        self._selections = {}
+
+    def __len__(self):
+        return len(self.entries)
+
+    def info(self, number):
+        return self.by_number.get(number)
+
+    def matching(self, difficulty=None, winner=None):
+        # Each filter combination is computed once; after that a draw is a
+        # random index into a list.
+        if difficulty is not None and difficulty not in DIFFICULTIES:
+            raise ValueError(f"Unknown difficulty: {difficulty}")
+        if winner is not None and winner not in WINNERS:
+            raise ValueError(f"Unknown winner: {winner}")
+        key = (difficulty, winner)
+        if key not in self._selections:
+            self._selections[key] = [
+                info for info in self.entries
+                if (difficulty is None or info.difficulty == difficulty) and
+                (winner is None or info.winner == WINNERS[winner])]
+        return self._selections[key]
+
+    def draw(self, count=1, difficulty=None, winner=None, seed=None, rng=None):
+        candidates = self.matching(difficulty, winner)
+        if not candidates:
+            raise ValueError("No start numbers match the filters")
+        if rng is None:
+            rng = random if seed is None else random.Random(seed)
+        return rng.sample(candidates, min(count, len(candidates)))
+
+
+def start_index():
+    global _index
+    if _index is None:
+        _index = StartIndex()
+    return _index
+
+
+def draw_start_numbers(count=1, difficulty=None, winner=None, seed=None, rng=None):
+    return [info.number for info in start_index().draw(count, difficulty, winner, seed, rng)]
@@ -0,0 +1,81 @@
+def _add_at(counts, index, amount=1):
+    if index >= len(counts):
+        counts.extend([0] * (index - len(counts) + 1))
+    counts[index] += amount
+
+
+class SearchStats:
+    def __init__(self, on_node=None, on_exit=None, on_cutoff=None):
+        self.on_node = on_node
+        self.on_exit = on_exit
+        self.on_cutoff = on_cutoff
+        self.searches = 0
+        self.nodes = 0
+        self.nodes_by_depth = []
+        self.leaf_evaluations = 0
+        self.terminal_hits = 0
+        self.cutoffs_by_ply = []
+        self.iterations = []
+        self.elapsed = 0.0
+
+    def enter_node(self, node, depth):
+        self.nodes += 1
+        _add_at(self.nodes_by_depth, depth)
+        if self.on_node is not None:
+            self.on_node(node, depth)
+
+    def exit_node(self, node, depth, value):
+        if self.on_exit is not None:
+            self.on_exit(node, depth, value)
+
+    def record_leaf(self, terminal):
+        self.leaf_evaluations += 1
+        if terminal:
+            self.terminal_hits += 1
+
+    def record_terminal(self):
+        self.terminal_hits += 1
+
+    def record_cutoff(self, depth, alpha=None, beta=None):
+        _add_at(self.cutoffs_by_ply, depth)
+        if self.on_cutoff is not None:
+            self.on_cutoff(depth, alpha, beta)
+
+    def record_iteration(self, depth, seconds, nodes):
+        self.iterations.append((depth, seconds, nodes))
+
+    @property
+    def cutoffs(self):
+        return sum(self.cutoffs_by_ply)
+
+    @property
+    def completed_depth(self):
+        return self.iterations[-1][0] if self.iterations else 0
+
+    def cutoff_rate(self):
+        interior_nodes = self.nodes - self.leaf_evaluations
+        return self.cutoffs / interior_nodes if interior_nodes > 0 else 0.0
+
+    def merge(self, other):
+        self.searches += other.searches
+        self.nodes += other.nodes
+        for depth, count in enumerate(other.nodes_by_depth):
+            _add_at(self.nodes_by_depth, depth, count)
+        self.leaf_evaluations += other.leaf_evaluations
+        self.terminal_hits += other.terminal_hits
+        for depth, count in enumerate(other.cutoffs_by_ply):
+            _add_at(self.cutoffs_by_ply, depth, count)
+        self.iterations.extend(other.iterations)
+        self.elapsed += other.elapsed
+
+    def to_dict(self):
+        return {
+            'searches': self.searches,
+            'nodes': self.nodes,
+            'nodes_by_depth': list(self.nodes_by_depth),
+            'leaf_evaluations': self.leaf_evaluations,
+            'terminal_hits': self.terminal_hits,
+            'cutoffs_by_ply': list(self.cutoffs_by_ply),
+            'iterations': [list(iteration) for iteration in self.iterations],
+            'elapsed': self.elapsed,
+        }
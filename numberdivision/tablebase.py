@@ -0,0 +1,144 @@
+import mmap
+import os
+import struct
+
+TABLEBASE_MAGIC = b'NDTB'
+TABLEBASE_VERSION = 1
+HEADER_FORMAT = '<4sHHI'
+HEADER_SIZE = struct.calcsize(HEADER_FORMAT)
+RECORD_FORMAT = '<bB'
+RECORD_SIZE = struct.calcsize(RECORD_FORMAT)
+
+DEFAULT_MAX_NUMBER = 30000
+DEFAULT_BANK_SLOTS = 16
+DEFAULT_TABLEBASE_PATH = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), 'number_game.tb')
+
+NO_MOVE = 0
+
+
+def solve_values(max_number=DEFAULT_MAX_NUMBER, bank_slots=DEFAULT_BANK_SLOTS):
+    # values[n][b] is the best final score margin the player to move can force
+    # from number n with b points in the bank. Every move divides the number,
+    # so sweeping n upwards visits each position after all of its successors.
+    # Banks past bank_slots are solved too, since a stored position may still
+    # move into them.
+    max_moves = max_number.bit_length()
+    bank_limit = bank_slots + max_moves
+    values = [None] * (max_number + 1)
+    moves = [None] * (max_number + 1)
+
+    for number in range(max_number + 1):
+        row_values = [0] * bank_limit
+        row_moves = [NO_MOVE] * bank_limit
+        children = []
+        if number > 10:
+            for move in [2, 3]:
+                if number % move == 0:
+                    child = number // move
+                    gain = 3 if move == 3 else -2
+                    bank_step = 1 if child % 5 == 0 else 0
+                    children.append((move, child, gain, bank_step))
+
+        for bank in range(bank_limit):
+            if not children:
+                row_values[bank] = -bank
+                continue
+            best_value = None
+            best_move = NO_MOVE
+            for move, child, gain, bank_step in children:
+                child_bank = bank + bank_step
+                if child_bank >= bank_limit:
+                    continue
+                value = gain - values[child][child_bank]
+                if best_value is None or value > best_value:
+                    best_value = value
+                    best_move = move
+            if best_value is None:
+                best_value = 0
+            row_values[bank] = best_value
+            row_moves[bank] = best_move
+
+        values[number] = row_values
+        moves[number] = row_moves
+
+    return values, moves
+
+
+def build_tablebase(path=DEFAULT_TABLEBASE_PATH, max_number=DEFAULT_MAX_NUMBER,
+                    bank_slots=DEFAULT_BANK_SLOTS):
+    values, moves = solve_values(max_number, bank_slots)
+
+    buffer = bytearray(HEADER_SIZE + (max_number + 1) * bank_slots * RECORD_SIZE)
+    struct.pack_into(HEADER_FORMAT, buffer, 0, TABLEBASE_MAGIC,
+                     TABLEBASE_VERSION, bank_slots, max_number)
+    offset = HEADER_SIZE
+    for number in range(max_number + 1):
+        row_values = values[number]
+        row_moves = moves[number]
+        for bank in range(bank_slots):
+            value = row_values[bank]
+            if not -128 <= value <= 127:
+                raise ValueError(
+                    f"Value {value} at number {number}, bank {bank} does not fit a record")
+            struct.pack_into(RECORD_FORMAT, buffer, offset, value, row_moves[bank])
+            offset += RECORD_SIZE
+
+    tmp_path = path + '.tmp'
+    with open(tmp_path, 'wb') as f:
+        f.write(buffer)
+    os.replace(tmp_path, path)
+    return path
+
+
+class Tablebase:
+    def __init__(self, path=DEFAULT_TABLEBASE_PATH):
+        self.path = path
+        self._file = open(path, 'rb')
+        try:
+            self._data = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"Tablebase file is empty: {path}")
+
+        magic, version, bank_slots, max_number = struct.unpack_from(
+            HEADER_FORMAT, self._data, 0)
+        expected_size = HEADER_SIZE + (max_number + 1) * bank_slots * RECORD_SIZE
+        if magic != TABLEBASE_MAGIC or version != TABLEBASE_VERSION or \
+                len(self._data) != expected_size:
+            self.close()
+            raise ValueError(f"Not a valid tablebase file: {path}")
+        self.bank_slots = bank_slots
+        self.max_number = max_number
+
+    def close(self):
+        self._data.close()
+        self._file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def lookup(self, number, bank):
+        if not (0 <= number <= self.max_number and 0 <= bank < self.bank_slots):
+            return None
+        offset = HEADER_SIZE + (number * self.bank_slots + bank) * RECORD_SIZE
+        return struct.unpack_from(RECORD_FORMAT, self._data, offset)
+
+    def best_move(self, number, bank):
+        entry = self.lookup(number, bank)
+        if entry is None or entry[1] == NO_MOVE:
+            return None
+        return entry[1]
+
+
+def open_default_tablebase():
+    if not os.path.exists(DEFAULT_TABLEBASE_PATH):
+        return None
+    try:
+        return Tablebase(DEFAULT_TABLEBASE_PATH)
+    except (OSError, ValueError):
+        return None
+
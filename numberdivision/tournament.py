@@ -0,0 +1,173 @@
+import itertools
+import json
+import os
+import random
+from collections import namedtuple
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from .evaluation import current_weights, use_weights
+from .records import GameRecordWriter, game_record
+from .rules import GameState, start_numbers
+from .search import get_computer_move
+
+PlayerConfig = namedtuple('PlayerConfig', ['algorithm', 'depth', 'weights'], defaults=[None])
+
+
+def parse_config(text):
+    algorithm, _, depth = text.partition(':')
+    return PlayerConfig(algorithm, int(depth) if depth else 4)
+
+
+def format_config(config):
+    return f"{config.algorithm}:{config.depth}"
+
+
+def play_game(start_number, player1_config, player2_config):
+    configs = (player1_config, player2_config)
+    move_times = [0.0, 0.0]
+    nodes = [0, 0]
+    move_counts = [0, 0]
+    per_move_times = []
+    per_move_nodes = []
+
+    game = GameState(start_number)
+    while not game.is_over():
+        player = game.current_turn
+        config = configs[player]
+        with use_weights(config.weights or current_weights()):
+            move, move_time, nodes_visited = get_computer_move(
+                game.number, game.player1_score, game.player2_score, game.game_bank,
+                config.algorithm, player == 1, config.depth)
+        move_times[player] += move_time
+        nodes[player] += nodes_visited
+        move_counts[player] += 1
+        if move is None:
+            break
+        per_move_times.append(move_time)
+        per_move_nodes.append(nodes_visited)
+        game.play(move)
+
+    p1_final, p2_final = game.final_scores()
+    return {
+        'start': start_number,
+        'player1': format_config(player1_config),
+        'player2': format_config(player2_config),
+        'moves': game.moves,
+        'final': [p1_final, p2_final],
+        'winner': game.winner(),
+        'move_time': move_times,
+        'nodes': nodes,
+        'move_count': move_counts,
+        'move_times': per_move_times,
+        'move_nodes': per_move_nodes,
+    }
+
+
+def _play_batch(jobs):
+    return [play_game(*job) for job in jobs]
+
+
+class ConfigSummary:
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+        self.margin = 0
+        self.move_time = 0.0
+        self.nodes = 0
+        self.moves = 0
+
+    def add(self, record, player):
+        own, other = record['final'][player], record['final'][1 - player]
+        self.games += 1
+        if record['winner'] is None:
+            self.draws += 1
+        elif record['winner'] == player:
+            self.wins += 1
+        else:
+            self.losses += 1
+        self.margin += own - other
+        self.move_time += record['move_time'][player]
+        self.nodes += record['nodes'][player]
+        self.moves += record['move_count'][player]
+
+
+class TournamentSummary:
+    def __init__(self):
+        self.pairings = {}
+
+    def add(self, record):
+        configs = (record['player1'], record['player2'])
+        pairing = tuple(sorted(configs))
+        summaries = self.pairings.setdefault(pairing, {config: ConfigSummary() for config in pairing})
+        if configs[0] == configs[1]:
+            summaries[configs[0]].add(record, 0)
+            return
+        for player, config in enumerate(configs):
+            summaries[config].add(record, player)
+
+    def format(self):
+        lines = [f"{'config':<16} {'games':>6} {'W':>6} {'D':>6} {'L':>6} {'avg margin':>11} "
+                 f"{'total time':>11} {'avg move time':>14} {'total nodes':>12} {'avg nodes':>10}"]
+        for pairing, summaries in sorted(self.pairings.items()):
+            lines.append(f"-- {' vs '.join(pairing)}")
+            for config in pairing:
+                summary = summaries[config]
+                avg_margin = summary.margin / summary.games if summary.games else 0.0
+                avg_time = summary.move_time / summary.moves if summary.moves else 0.0
+                avg_nodes = summary.nodes / summary.moves if summary.moves else 0.0
+                lines.append(
+                    f"{config:<16} {summary.games:>6} {summary.wins:>6} {summary.draws:>6} "
+                    f"{summary.losses:>6} {avg_margin:>+11.2f} {summary.move_time:>10.3f}s "
+                    f"{avg_time:>13.6f}s {summary.nodes:>12} {avg_nodes:>10.1f}")
+        return '\n'.join(lines)
+
+
+def tournament_jobs(configs, numbers):
+    if len(configs) == 1:
+        pairings = [(configs[0], configs[0])]
+    else:
+        pairings = list(itertools.combinations(configs, 2))
+    jobs = []
+    for first, second in pairings:
+        for number in numbers:
+            jobs.append((number, first, second))
+            if first != second:
+                jobs.append((number, second, first))
+    return jobs
+
+
+def run_tournament(configs, numbers=None, sample=None, seed=None, workers=None,
+                   output_path=None, batch_size=16, records_path=None):
+    if numbers is None:
+        numbers = list(start_numbers())
+    if sample is not None and sample < len(numbers):
+        numbers = sorted(random.Random(seed).sample(numbers, sample))
+
+    jobs = tournament_jobs(configs, numbers)
+    batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+    summary = TournamentSummary()
+    output = open(output_path, 'w') if output_path else None
+    records = GameRecordWriter(records_path) if records_path else None
+    try:
+        with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+            futures = [executor.submit(_play_batch, batch) for batch in batches]
+            for future in as_completed(futures):
+                for record in future.result():
+                    summary.add(record)
+                    if output is not None:
+                        output.write(json.dumps(record) + '\n')
+                    if records is not None:
+                        records.write(game_record(
+                            record['start'], (record['player1'], record['player2']),
+                            record['moves'], record['move_times'], record['move_nodes'],
+                            record['final']))
+                if output is not None:
+                    output.flush()
+    finally:
+        if output is not None:
+            output.close()
+        if records is not None:
+            records.close()
+    return summary
@@ -0,0 +1,78 @@
+from collections import OrderedDict
+
+TT_EXACT = 0
+TT_LOWER = 1
+TT_UPPER = 2
+
+
+class TranspositionTable:
+    def __init__(self, max_entries=1 << 16, replacement='lru'):
+        if replacement not in ('lru', 'depth'):
+            raise ValueError(f"Unknown replacement scheme: {replacement}")
+        self.max_entries = max_entries
+        self.replacement = replacement
+        self.hits = 0
+        self.misses = 0
+        self.stores = 0
+        self.evictions = 0
+        self.clear()
+
+    def clear(self):
+        if self.replacement == 'lru':
+            self.entries = OrderedDict()
+        else:
+            self.entries = [None] * self.max_entries
+
+    def __len__(self):
+        if self.replacement == 'lru':
+            return len(self.entries)
+        return sum(1 for slot in self.entries if slot is not None)
+
+    @staticmethod
+    def make_key(node, human_is_player1, remaining_depth):
+        return position_key(node, human_is_player1) + (remaining_depth,)
+
+    def probe(self, key):
+        if self.replacement == 'lru':
+            entry = self.entries.get(key)
+            if entry is not None:
+                self.entries.move_to_end(key)
+        else:
+            slot = self.entries[hash(key) % self.max_entries]
+            entry = slot[1] if slot is not None and slot[0] == key else None
+
+        if entry is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return entry
+
+    def store(self, key, value, flag, best_move):
+        entry = (value, flag, best_move)
+        self.stores += 1
+        if self.replacement == 'lru':
+            if key in self.entries:
+                self.entries.move_to_end(key)
+            elif len(self.entries) >= self.max_entries:
+                self.entries.popitem(last=False)
+                self.evictions += 1
+            self.entries[key] = entry
+            return
+
+        index = hash(key) % self.max_entries
+        slot = self.entries[index]
+        if slot is not None and slot[0] != key:
+            if slot[0][4] > key[4]:
+                return
+            self.evictions += 1
+        self.entries[index] = (key, entry)
+
+    def hit_rate(self):
+        probes = self.hits + self.misses
+        return self.hits / probes if probes else 0.0
+
+
+def position_key(node, human_is_player1):
+    ai_score = node.player2_score if human_is_player1 else node.player1_score
+    human_score = node.player1_score if human_is_player1 else node.player2_score
+    return (node.number, ai_score - human_score, node.game_bank, node.is_maximizing)
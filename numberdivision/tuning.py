@@ -0,0 +1,148 @@
+import os
+import random
+from concurrent.futures import ProcessPoolExecutor
+
+from .evaluation import DEFAULT_WEIGHTS
+from .negamax import SCALE
+from .rules import start_numbers
+from .tournament import PlayerConfig, _play_batch
+
+DEFAULT_TUNING_ALGORITHM = 'alpha-beta'
+DEFAULT_TUNING_DEPTH = 2
+TUNING_FACTORS = (1, 5, 7, 11, 13, 25, 35)
+# progress_scale is left alone: the negamax engines and the opening book
+# scale the heuristic by negamax.SCALE and need it to move in steps of
+# 1/1000, which (origin - number) / progress_scale only does while
+# progress_scale divides 1000. The tuned weights are rounded to that step.
+TUNED_FIELDS = ('terminal_bonus', 'three_option', 'bank_weight')
+# How far one SPSA perturbation moves each weight, and the smallest value
+# each weight may take.
+PERTURBATION = {'terminal_bonus': 200.0, 'three_option': 1.0, 'bank_weight': 0.5}
+MINIMUM = {'terminal_bonus': 1.0, 'three_option': 0.0, 'bank_weight': 0.0}
+
+
+def tuning_numbers(seed=None, held_out=0.2):
+    # Games from the GUI start numbers last at most 14 plies and are mostly
+    # decided inside the search horizon, so weight changes hardly show up
+    # there. Numbers with many factors of 2 and 3 give long games in which
+    # the heuristic picks the moves; they start above progress_origin, where
+    # the progress term is zero, and end in the start-number range. Returns
+    # a training set and a held-out set; command_tune also compares on the
+    # start numbers themselves.
+    numbers = sorted(2 ** twos * 3 ** threes * factor
+                     for twos in range(6, 17) for threes in range(4, 11)
+                     for factor in TUNING_FACTORS)
+    random.Random(seed).shuffle(numbers)
+    split = int(len(numbers) * (1 - held_out))
+    return sorted(numbers[:split]), sorted(numbers[split:])
+
+
+class MatchResult:
+    def __init__(self):
+        self.games = 0
+        self.wins = 0
+        self.draws = 0
+        self.losses = 0
+        self.nodes = [0, 0]
+        self.moves = [0, 0]
+
+    def add(self, record, first_player):
+        self.games += 1
+        if record['winner'] is None:
+            self.draws += 1
+        elif record['winner'] == first_player:
+            self.wins += 1
+        else:
+            self.losses += 1
+        second_player = 1 - first_player
+        self.nodes[0] += record['nodes'][first_player]
+        self.nodes[1] += record['nodes'][second_player]
+        self.moves[0] += record['move_count'][first_player]
+        self.moves[1] += record['move_count'][second_player]
+
+    def score(self):
+        return (self.wins - self.losses) / self.games if self.games else 0.0
+
+    def win_rate(self):
+        return (self.wins + 0.5 * self.draws) / self.games if self.games else 0.0
+
+    def nodes_per_move(self, side):
+        return self.nodes[side] / self.moves[side] if self.moves[side] else 0.0
+
+    def to_dict(self):
+        return {
+            'games': self.games,
+            'wins': self.wins,
+            'draws': self.draws,
+            'losses': self.losses,
+            'win_rate': self.win_rate(),
+            'nodes_per_move': [self.nodes_per_move(0), self.nodes_per_move(1)],
+        }
+
+
+def play_match(executor, weights, opponent_weights, numbers, algorithm=DEFAULT_TUNING_ALGORITHM,
+               depth=DEFAULT_TUNING_DEPTH, batch_size=16):
+    # Every number is played twice with colours swapped, and the result is
+    # counted from the side of `weights`.
+    config = PlayerConfig(algorithm, depth, weights)
+    opponent = PlayerConfig(algorithm, depth, opponent_weights)
+    jobs = []
+    for number in numbers:
+        jobs.append((number, config, opponent))
+        jobs.append((number, opponent, config))
+    batches = [jobs[i:i + batch_size] for i in range(0, len(jobs), batch_size)]
+
+    result = MatchResult()
+    for batch, records in zip(batches, executor.map(_play_batch, batches)):
+        for job, record in zip(batch, records):
+            result.add(record, 0 if job[1] is config else 1)
+    return result
+
+
+def _weights_from(values):
+    weights = {field: round(max(MINIMUM[field], value) * SCALE) / SCALE
+               for field, value in values.items()}
+    return DEFAULT_WEIGHTS._replace(**weights)
+
+
+def spsa_tune(initial=DEFAULT_WEIGHTS, iterations=40, games=64, algorithm=DEFAULT_TUNING_ALGORITHM,
+              depth=DEFAULT_TUNING_DEPTH, seed=None, workers=None, numbers=None,
+              learning_rate=0.5, perturbation=1.0, progress=None):
+    # Simultaneous perturbation: each iteration plays theta + c*delta against
+    # theta - c*delta for a random sign vector delta and steps every weight
+    # along delta by the match score. Weights are measured in PERTURBATION
+    # units so a single step size suits all of them.
+    rng = random.Random(seed)
+    if numbers is None:
+        numbers = tuning_numbers(seed)[0]
+    theta = {field: float(getattr(initial, field)) for field in TUNED_FIELDS}
+    stability = iterations / 10
+
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        for iteration in range(iterations):
+            step_size = learning_rate / (iteration + 1 + stability) ** 0.602
+            spread = perturbation / (iteration + 1) ** 0.101
+            delta = {field: rng.choice((-1, 1)) for field in TUNED_FIELDS}
+            plus = _weights_from({field: theta[field] + spread * delta[field] * PERTURBATION[field]
+                                  for field in TUNED_FIELDS})
+            minus = _weights_from({field: theta[field] - spread * delta[field] * PERTURBATION[field]
+                                   for field in TUNED_FIELDS})
+
+            sample = rng.sample(numbers, min(len(numbers), max(1, games // 2)))
+            result = play_match(executor, plus, minus, sample, algorithm, depth)
+            gradient = result.score() / (2 * spread)
+            for field in TUNED_FIELDS:
+                theta[field] = max(MINIMUM[field], theta[field] +
+                                   step_size * gradient * delta[field] * PERTURBATION[field])
+            if progress is not None:
+                progress(iteration, _weights_from(theta), result)
+
+    return _weights_from(theta)
+
+
+def compare_weights(weights, baseline=DEFAULT_WEIGHTS, numbers=None,
+                    algorithm=DEFAULT_TUNING_ALGORITHM, depth=DEFAULT_TUNING_DEPTH, workers=None):
+    if numbers is None:
+        numbers = list(start_numbers())
+    with ProcessPoolExecutor(max_workers=workers or os.cpu_count()) as executor:
+        return play_match(executor, weights, baseline, numbers, algorithm, depth)
@@ -0,0 +1,135 @@
+import queue
+import threading
+
+from .rules import apply_move, legal_moves
+from .search import SearchControl, get_computer_move, get_profiler, max_game_length
+
+SOLVED_DEPTH = float('inf')
+
+
+class SearchWorker:
+    def __init__(self):
+        self.results = queue.Queue()
+        self.control = None
+        self.thread = None
+
+    def start(self, *args, **kwargs):
+        self.stop()
+        control = SearchControl()
+        kwargs['control'] = control
+        self.control = control
+        self.thread = threading.Thread(
+            target=self._run, args=(control, args, kwargs), daemon=True)
+        self.thread.start()
+
+    def _run(self, control, args, kwargs):
+        try:
+            result = get_computer_move(*args, **kwargs)
+        except Exception as exc:
+            result = exc
+        self.results.put((control, result))
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def poll(self):
+        while True:
+            try:
+                control, result = self.results.get_nowait()
+            except queue.Empty:
+                return None
+            if control is self.control:
+                self.control = None
+                return result
+
+    def stop(self):
+        if self.control is not None:
+            self.control.stop()
+
+    def shutdown(self, timeout=1.0):
+        self.stop()
+        self.control = None
+        if self.thread is not None:
+            self.thread.join(timeout)
+
+
+def ponder_key(number, p1_score, p2_score, bank, human_is_player1):
+    ai_score = p2_score if human_is_player1 else p1_score
+    human_score = p1_score if human_is_player1 else p2_score
+    return (number, ai_score - human_score, bank)
+
+
+class Ponderer:
+    def __init__(self, max_depth=None):
+        self.max_depth = max_depth
+        self.results = {}
+        self.lock = threading.Lock()
+        self.control = None
+        self.thread = None
+        self.searches = 0
+
+    def start(self, number, p1_score, p2_score, bank, current_turn, human_is_player1, algorithm, tt=None):
+        self.stop()
+        replies = []
+        for move in legal_moves(number):
+            reply = apply_move(number, p1_score, p2_score, bank, current_turn, move)
+            replies.append(reply)
+        if not replies:
+            return
+
+        control = SearchControl()
+        self.control = control
+        self.thread = threading.Thread(
+            target=self._run, args=(control, replies, human_is_player1, algorithm, tt), daemon=True)
+        self.thread.start()
+
+    def _run(self, control, replies, human_is_player1, algorithm, tt):
+        # A profiler sees a whole pondering session as one profile instead of
+        # one per reply and depth.
+        profiler = get_profiler()
+        if profiler is None:
+            self._ponder(control, replies, human_is_player1, algorithm, tt)
+            return
+        with profiler.capture(f"ponder {algorithm} {' '.join(str(reply[0]) for reply in replies)}"):
+            self._ponder(control, replies, human_is_player1, algorithm, tt)
+
+    def _ponder(self, control, replies, human_is_player1, algorithm, tt):
+        pending = list(replies)
+        depth = 1
+        while pending and (self.max_depth is None or depth <= self.max_depth):
+            for reply in list(pending):
+                move, _, _ = get_computer_move(*reply, algorithm, human_is_player1, depth, tt,
+                                               control=control)
+                if control.stopped:
+                    return
+                reached = depth if depth < max_game_length(reply[0]) else SOLVED_DEPTH
+                with self.lock:
+                    self.results[ponder_key(*reply, human_is_player1)] = (reached, move)
+                    self.searches += 1
+                if reached == SOLVED_DEPTH:
+                    pending.remove(reply)
+            depth += 1
+
+    def lookup(self, number, p1_score, p2_score, bank, human_is_player1, min_depth=0):
+        with self.lock:
+            result = self.results.get(ponder_key(number, p1_score, p2_score, bank, human_is_player1))
+        if result is None or result[0] < min_depth:
+            return None
+        return result
+
+    def is_running(self):
+        return self.thread is not None and self.thread.is_alive()
+
+    def stop(self):
+        if self.control is not None:
+            self.control.stop()
+            self.control = None
+        if self.thread is not None:
+            self.thread.join()
+            self.thread = None
+
+    def clear(self):
+        self.stop()
+        with self.lock:
+            self.results.clear()
+            self.searches = 0
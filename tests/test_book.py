@@ -0,0 +1,58 @@
+import math
+
+import pytest
+
+from numberdivision import OpeningBook, build_book
+from numberdivision.book import book_key, opening_positions
+from numberdivision.fast_search import SearchState
+from numberdivision.negamax import alpha_beta
+
+NUMBERS = [20736, 24576, 26244]
+PLIES = 3
+DEPTH = 8
+
+
+@pytest.fixture(scope='module')
+def book(tmp_path_factory):
+    path = str(tmp_path_factory.mktemp('book') / 'small.book')
+    build_book(path, NUMBERS, PLIES, DEPTH)
+    with OpeningBook(path) as book:
+        yield book
+
+
+def test_book_round_trip(book):
+    positions = opening_positions(NUMBERS, PLIES)
+    assert len(book) == len(positions)
+    assert (book.plies, book.depth) == (PLIES, DEPTH)
+    for number, score_diff, bank in positions:
+        value, move = alpha_beta(SearchState(number, score_diff, bank), DEPTH, -math.inf, math.inf)
+        assert book.lookup(number, score_diff, bank) == (move, value)
+
+
+def test_book_misses_positions_it_does_not_hold(book):
+    positions = set(opening_positions(NUMBERS, PLIES))
+    # Keys either side of every stored key exercise both branches of the
+    # binary search.
+    for number, score_diff, bank in sorted(positions):
+        for key in [(number - 1, score_diff, bank), (number, score_diff + 1, bank),
+                    (number, score_diff, bank + 1)]:
+            if key not in positions:
+                assert book.lookup(*key) is None
+    assert book.lookup(0, 0, 0) is None
+    assert book.lookup(2 ** 32 - 1, 0, 0) is None
+
+
+def test_best_move_sees_the_position_from_the_computer(book):
+    number, score_diff, bank = next(position for position in opening_positions(NUMBERS, PLIES)
+                                    if position[1] != 0)
+    expected = book.lookup(number, score_diff, bank)[0]
+    assert book_key(number, 0, score_diff, bank, True) == (number, score_diff, bank)
+    assert book.best_move(number, 0, score_diff, bank, True) == expected
+    assert book.best_move(number, score_diff, 0, bank, False) == expected
+
+
+def test_book_rejects_other_files(tmp_path):
+    path = tmp_path / 'bad.book'
+    path.write_bytes(b'NDTB' + bytes(32))
+    with pytest.raises(ValueError):
+        OpeningBook(str(path))
@@ -0,0 +1,74 @@
+import struct
+
+import pytest
+
+from numberdivision import GameRecordWriter, game_record, read_records
+from numberdivision.records import FILE_HEADER_SIZE, decode_record, encode_record
+
+
+def sample_records():
+    return [
+        game_record(24576, ('Human', 'Alpha-Beta d4'), [2, 3, 2], [0.5, 0.001234, 2.0],
+                    [0, 1500, 0], (5, 3), timestamp=1700000000.25),
+        game_record(10 ** 30, ('lattice', 'pvs:6'), [3] * 20, [0.0] * 20, [7] * 20, (60, 61),
+                    timestamp=1700000001.0),
+        game_record(20736, ('', 'MTD(f)'), [], [], [], (0, 0), timestamp=1700000002.0),
+    ]
+
+
+def test_record_round_trip():
+    for record in sample_records():
+        body = encode_record(record)[4:]
+        assert decode_record(body) == record
+
+
+def test_draw_and_winner():
+    records = sample_records()
+    assert records[0].winner == 0
+    assert records[1].winner == 1
+    assert records[2].winner is None
+
+
+def test_long_labels_are_cut_on_a_character_boundary():
+    label = 'é' * 200
+    record = game_record(24576, (label, 'x' * 300), [2], [0.1], [1], (1, 0), timestamp=0.0)
+    decoded = decode_record(encode_record(record)[4:])
+    assert decoded.players == ('é' * 127, 'x' * 255)
+
+
+def test_records_that_do_not_fit_raise_value_error():
+    with pytest.raises(ValueError):
+        encode_record(game_record(24576, ('a', 'b'), [2], [0.1, 0.2], [1], (0, 0)))
+    with pytest.raises(ValueError):
+        encode_record(game_record(-6, ('a', 'b'), [], [], [], (0, 0)))
+
+
+def test_writer_appends_to_an_existing_file(tmp_path):
+    path = str(tmp_path / 'games.rec')
+    first, second, third = sample_records()
+    with GameRecordWriter(path) as writer:
+        writer.write(first)
+        writer.write(second)
+    with GameRecordWriter(path, buffer_size=1) as writer:
+        writer.write(third)
+    assert list(read_records(path)) == [first, second, third]
+
+
+def test_truncated_record_ends_the_stream(tmp_path):
+    path = tmp_path / 'games.rec'
+    first, second, _ = sample_records()
+    with GameRecordWriter(str(path)) as writer:
+        writer.write(first)
+        writer.write(second)
+    path.write_bytes(path.read_bytes()[:-3])
+    assert list(read_records(str(path))) == [first]
+
+
+def test_other_files_are_rejected(tmp_path):
+    path = tmp_path / 'other.rec'
+    path.write_bytes(struct.pack('<4sH', b'NDTB', 1))
+    with pytest.raises(ValueError):
+        list(read_records(str(path)))
+    with pytest.raises(ValueError):
+        GameRecordWriter(str(path))
+    assert path.stat().st_size == FILE_HEADER_SIZE
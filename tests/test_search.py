@@ -0,0 +1,79 @@
+import math
+import random
+
+import pytest
+
+from numberdivision import (GameNode, TranspositionTable, alpha_beta, get_computer_move, minimax,
+                            mtdf, start_numbers)
+from numberdivision.negamax import SCALE, WIN_SCORE, _root_state
+
+DEPTHS = [1, 2, 3, 5]
+ALGORITHMS = ['minimax', 'alpha-beta', 'negamax', 'pvs', 'mtdf']
+POSITIONS = [(number, 0, 0, 0, human_is_player1)
+             for number, human_is_player1 in zip(random.Random(21).sample(start_numbers(), 12),
+                                                 [True, False] * 6)]
+POSITIONS += [(4860, 3, 0, 2, True), (1620, 0, 5, 1, False), (20736, 2, 2, 0, True)]
+
+
+def minimax_value(position, depth, use_alpha_beta=False, tt=None):
+    number, p1_score, p2_score, bank, human_is_player1 = position
+    root = GameNode(number, p1_score, p2_score, bank, 0, True)
+    return minimax(root, 0, -math.inf, math.inf, use_alpha_beta, human_is_player1, depth, tt)
+
+
+def scaled(value):
+    # minimax scores a position with no legal move as +-inf, negamax as
+    # +-WIN_SCORE.
+    if math.isinf(value):
+        return WIN_SCORE if value > 0 else -WIN_SCORE
+    return round(value * SCALE)
+
+
+def negamax_value(position, depth, **kwargs):
+    return alpha_beta(_root_state(*position), depth, -math.inf, math.inf, **kwargs)[0]
+
+
+@pytest.mark.parametrize('depth', DEPTHS)
+@pytest.mark.parametrize('position', POSITIONS)
+def test_alpha_beta_matches_minimax(position, depth):
+    assert minimax_value(position, depth, True) == minimax_value(position, depth)
+
+
+@pytest.mark.parametrize('use_alpha_beta', [False, True])
+@pytest.mark.parametrize('position', POSITIONS)
+def test_transposition_table_keeps_values(position, use_alpha_beta):
+    tt = TranspositionTable()
+    for depth in DEPTHS:
+        assert minimax_value(position, depth, use_alpha_beta, tt) == \
+            minimax_value(position, depth, use_alpha_beta)
+
+
+@pytest.mark.parametrize('depth', DEPTHS)
+@pytest.mark.parametrize('position', POSITIONS)
+def test_negamax_searches_match_alpha_beta(position, depth):
+    expected = scaled(minimax_value(position, depth, True))
+    assert negamax_value(position, depth) == expected
+    assert negamax_value(position, depth, tt=TranspositionTable()) == expected
+    assert negamax_value(position, depth, pvs=True) == expected
+    assert mtdf(_root_state(*position), depth, 0, TranspositionTable())[0] == expected
+
+
+@pytest.mark.parametrize('algorithm', ALGORITHMS)
+@pytest.mark.parametrize('position', POSITIONS)
+def test_every_engine_picks_a_best_move(position, algorithm):
+    # Engines may break ties differently, so check that the move keeps the
+    # value of the position rather than comparing the moves themselves.
+    depth = 4
+    number, p1_score, p2_score, bank, human_is_player1 = position
+    move = get_computer_move(number, p1_score, p2_score, bank, algorithm, human_is_player1,
+                             depth)[0]
+    state = _root_state(*position)
+    state.apply(move)
+    value = -alpha_beta(state, depth - 1, -math.inf, math.inf)[0]
+    assert value == negamax_value(position, depth)
+
+
+@pytest.mark.parametrize('algorithm', ['alpha-beta', 'negamax', 'pvs', 'mtdf'])
+def test_time_budget_search_returns_a_legal_move(algorithm):
+    move = get_computer_move(24576, 0, 0, 0, algorithm, True, None, time_budget_ms=50)[0]
+    assert move in (2, 3) and 24576 % move == 0
@@ -0,0 +1,93 @@
+import asyncio
+import json
+
+import pytest
+
+from numberdivision.server import GameServer
+
+
+async def request(reader, writer, message):
+    writer.write((message if isinstance(message, bytes) else json.dumps(message).encode()) + b'\n')
+    await writer.drain()
+    return json.loads(await reader.readline())
+
+
+async def run_session(exchange):
+    server = GameServer(workers=1)
+    await server.start('127.0.0.1', 0)
+    try:
+        reader, writer = await asyncio.open_connection(*server.address()[:2])
+        try:
+            return await exchange(server, reader, writer)
+        finally:
+            writer.close()
+            await writer.wait_closed()
+    finally:
+        await server.close()
+
+
+def test_game_over_the_protocol():
+    async def exchange(server, reader, writer):
+        response = await request(reader, writer, {'cmd': 'start', 'number': 24576,
+                                                  'algorithm': 'alpha-beta', 'depth': 3})
+        assert response['ok'] and 'computer_move' not in response
+        state = response['state']
+        assert state['scores'] == [0, 0] and state['legal_moves'] == [2, 3]
+        while not state['over']:
+            response = await request(reader, writer, {'cmd': 'move', 'game': state['game'],
+                                                      'divisor': state['legal_moves'][0]})
+            assert response['ok']
+            state = response['state']
+        assert 'final' in state and 'winner' in state
+        assert (await request(reader, writer, {'cmd': 'state', 'game': state['game']}))['state'] \
+            == state
+        assert (await request(reader, writer, {'cmd': 'close', 'game': state['game']}))['ok']
+        stats = await request(reader, writer, {'cmd': 'stats'})
+        assert stats['sessions'] == 0 and stats['cache']['misses'] > 0
+
+    asyncio.run(run_session(exchange))
+
+
+def test_computer_first_moves_on_start():
+    async def exchange(server, reader, writer):
+        response = await request(reader, writer, {'cmd': 'start', 'number': 20736, 'depth': 2,
+                                                  'computer_first': True})
+        assert response['ok'] and response['computer_move'] in (2, 3)
+        assert response['state']['moves'] == [response['computer_move']]
+        assert response['state']['turn'] == response['state']['human_player'] == 1
+
+    asyncio.run(run_session(exchange))
+
+
+@pytest.mark.parametrize('message', [
+    b'not json',
+    b'[1, 2]',
+    {'cmd': 'dance'},
+    {'cmd': 'start', 'number': 10},
+    {'cmd': 'start', 'number': 24576, 'depth': 0},
+    {'cmd': 'start', 'number': 24576, 'depth': 41},
+    {'cmd': 'start', 'number': 24576, 'algorithm': 'no-such-engine'},
+    {'cmd': 'move', 'game': 99, 'divisor': 2},
+])
+def test_bad_requests_get_an_error_reply(message):
+    async def exchange(server, reader, writer):
+        response = await request(reader, writer, message)
+        assert not response['ok'] and response['error']
+        # The connection stays usable after an error.
+        assert (await request(reader, writer, {'cmd': 'stats'}))['ok']
+
+    asyncio.run(run_session(exchange))
+
+
+def test_games_belong_to_their_connection():
+    async def exchange(server, reader, writer):
+        game = (await request(reader, writer, {'cmd': 'start', 'number': 24576}))['state']['game']
+        other_reader, other_writer = await asyncio.open_connection(*server.address()[:2])
+        try:
+            response = await request(other_reader, other_writer, {'cmd': 'state', 'game': game})
+            assert not response['ok']
+        finally:
+            other_writer.close()
+            await other_writer.wait_closed()
+
+    asyncio.run(run_session(exchange))
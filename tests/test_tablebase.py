@@ -0,0 +1,46 @@
+import pytest
+
+from numberdivision import Tablebase, build_tablebase, get_lattice_move, solve_lattice
+from numberdivision.tablebase import NO_MOVE, solve_values
+
+MAX_NUMBER = 3000
+BANK_SLOTS = 4
+
+
+@pytest.fixture(scope='module')
+def solved():
+    return solve_values(MAX_NUMBER, BANK_SLOTS)
+
+
+def test_tablebase_matches_lattice_solver(solved):
+    values, moves = solved
+    for number in range(1, MAX_NUMBER + 1):
+        for bank in range(BANK_SLOTS):
+            solution = solve_lattice(number, bank)
+            assert values[number][bank] == solution.value(), (number, bank)
+            assert moves[number][bank] == (solution.best_move() or NO_MOVE), (number, bank)
+
+
+def test_tablebase_file_round_trip(tmp_path, solved):
+    values, moves = solved
+    path = build_tablebase(str(tmp_path / 'small.tb'), MAX_NUMBER, BANK_SLOTS)
+    with Tablebase(path) as tablebase:
+        assert (tablebase.max_number, tablebase.bank_slots) == (MAX_NUMBER, BANK_SLOTS)
+        for number in range(MAX_NUMBER + 1):
+            for bank in range(BANK_SLOTS):
+                assert tablebase.lookup(number, bank) == (values[number][bank], moves[number][bank])
+        assert tablebase.lookup(MAX_NUMBER + 1, 0) is None
+        assert tablebase.lookup(24, BANK_SLOTS) is None
+        assert tablebase.best_move(7, 0) is None
+        assert tablebase.best_move(2916, 1) == get_lattice_move(2916, 1)[0]
+
+
+def test_tablebase_rejects_other_files(tmp_path):
+    empty = tmp_path / 'empty.tb'
+    empty.write_bytes(b'')
+    with pytest.raises(ValueError):
+        Tablebase(str(empty))
+    garbage = tmp_path / 'garbage.tb'
+    garbage.write_bytes(b'NDGR' + bytes(64))
+    with pytest.raises(ValueError):
+        Tablebase(str(garbage))